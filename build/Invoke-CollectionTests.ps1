@@ -24,7 +24,7 @@ param(
 
     # Select only a single target for integration tests to run only a portion of the tests.
     [Parameter(ParameterSetName = 'Vagrant')]
-    [ValidateSet('win_chocolatey', 'win_chocolatey_config', 'win_chocolatey_facts', 'win_chocolatey_feature', 'win_chocolatey_source', 'win_chocolatey-legacy')]
+    [ValidateSet('choco_timings', 'choco_version_filters', 'package_index', 'package_version', 'win_chocolatey', 'win_chocolatey_config', 'win_chocolatey_facts', 'win_chocolatey_feature', 'win_chocolatey_job', 'win_chocolatey_log', 'win_chocolatey_source', 'win_chocolatey-legacy')]
     [string]
     $TestTarget
 )
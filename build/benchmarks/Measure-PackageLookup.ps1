@@ -0,0 +1,108 @@
+<#
+    .SYNOPSIS
+    Compares the cost of looking up installed package versions by scanning the
+    installed package list against looking them up in an index.
+
+    .DESCRIPTION
+    Times `Get-ChocolateyPackageVersion` from
+    `chocolatey/plugins/module_utils/Packages.psm1` against the `Where-Object`
+    scan it replaced. `Get-ChocolateyPackage` is replaced with one that outputs
+    generated package data, so it can be run under pwsh on any platform without
+    choco.exe.
+
+    .EXAMPLE
+    pwsh ./build/benchmarks/Measure-PackageLookup.ps1 -InstalledCount 1000, 5000 -RequestedCount 150
+#>
+[CmdletBinding()]
+param(
+    # The number of installed packages to generate for each run.
+    [Parameter()]
+    [int[]]
+    $InstalledCount = @(1000, 5000),
+
+    # The number of package names to look up in each run.
+    [Parameter()]
+    [int]
+    $RequestedCount = 150,
+
+    # The number of times to repeat each measurement, the fastest run is reported.
+    [Parameter()]
+    [int]
+    $Iterations = 3
+)
+
+# The lookup `Get-ChocolateyPackageVersion` made before it indexed the installed packages.
+function Get-PackageVersionByScan {
+    param($InstalledPackages, $Name)
+
+    $results = @{}
+    foreach ($packageName in $Name) {
+        $packageInfo = $InstalledPackages | Where-Object { $_.package -eq $packageName }
+        $results.$packageName = if ($null -eq $packageInfo) { $null } else { @($packageInfo.version) }
+    }
+
+    $results
+}
+
+function Import-ModuleUtil {
+    param([string]$Name)
+
+    # The modules named by the #Requires statements are only available to modules run by Ansible on a Windows
+    # host, and the lookup doesn't use them.
+    $path = Join-Path -Path $PSScriptRoot -ChildPath "../../chocolatey/plugins/module_utils/$Name.psm1"
+    $source = (Get-Content -LiteralPath $path -Raw) -replace '(?m)^#Requires .*$', ''
+    New-Module -Name $Name -ScriptBlock ([scriptblock]::Create($source)) | Import-Module -Force
+}
+
+Import-ModuleUtil -Name Common
+Import-ModuleUtil -Name Packages
+
+# Replace the choco.exe call in the module with the generated packages, so only the lookup itself is timed.
+& (Get-Module -Name Packages) {
+    function script:Get-ChocolateyPackage {
+        [CmdletBinding()]
+        param($ChocoCommand, $Version)
+
+        $script:BenchmarkPackages
+    }
+}
+
+# Only the path of the command is passed on, it is never run.
+$chocoCommand = Get-Command -Name Write-Output
+
+function Measure-Fastest {
+    param([scriptblock]$ScriptBlock, [int]$Iterations)
+
+    (1..$Iterations | ForEach-Object { (Measure-Command -Expression $ScriptBlock).TotalMilliseconds } |
+        Measure-Object -Minimum).Minimum
+}
+
+foreach ($count in $InstalledCount) {
+    $installedPackages = foreach ($i in 1..$count) {
+        @{ package = "package-$i"; version = "1.0.$i" }
+    }
+    & (Get-Module -Name Packages) { $script:BenchmarkPackages = $args[0] } $installedPackages
+
+    # Ask for a mix of installed and missing packages, spread across the installed list.
+    $step = [Math]::Max(1, [int]($count / $RequestedCount))
+    $names = foreach ($i in 1..$RequestedCount) {
+        if ($i % 10 -eq 0) { "missing-package-$i" } else { "PACKAGE-$(($i * $step) % $count + 1)" }
+    }
+
+    $scan = Measure-Fastest -Iterations $Iterations -ScriptBlock {
+        $null = Get-PackageVersionByScan -InstalledPackages $installedPackages -Name $names
+    }
+    $index = Measure-Fastest -Iterations $Iterations -ScriptBlock {
+        $null = $names | Get-ChocolateyPackageVersion -ChocoCommand $chocoCommand
+    }
+
+    [PSCustomObject]@{
+        Installed = $count
+        Requested = $RequestedCount
+        ScanMs = [Math]::Round($scan, 1)
+        IndexMs = [Math]::Round($index, 1)
+        Speedup = '{0:N1}x' -f ($scan / [Math]::Max($index, 0.001))
+    }
+}
+
+Remove-Module -Name Packages, Common -Force -ErrorAction SilentlyContinue
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2020, Chocolatey Software
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Compares the cost of comparing package versions with the choco_version_compare filter
+against the version test from ansible-core, across generated version pairs.
+
+The versions are drawn from a pool of distinct versions, as the facts of a fleet repeat
+the same few versions of each package many times over. The version test can't order some
+pairs of prereleases at all, so those pairs are counted as failures, and the timings are
+also reported for the pairs of release versions alone. Requires ansible-core, run it on
+the controller with:
+
+    python ./build/benchmarks/measure_version_compare.py --pairs 100000 --distinct 2000
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import timeit
+
+COLLECTION = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'chocolatey')
+
+
+def load(name, path):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(COLLECTION, path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def generate_versions(count, rng):
+    versions = set()
+    while len(versions) < count:
+        parts = [rng.randint(0, 30) for dummy in range(rng.choice((2, 3, 3, 3, 4)))]
+        version = '.'.join(str(p) for p in parts)
+        if rng.random() < 0.1:
+            version += '-%s.%d' % (rng.choice(('alpha', 'beta', 'rc')), rng.randint(1, 12))
+        versions.add(version)
+
+    return sorted(versions)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pairs', type=int, default=100000, help='The number of version pairs to compare.')
+    parser.add_argument('--distinct', type=int, default=2000, help='The number of distinct versions to draw from.')
+    parser.add_argument('--iterations', type=int, default=3, help='The fastest of this many runs is reported.')
+    args = parser.parse_args()
+
+    nuget = load('ansible_collections.chocolatey.chocolatey.plugins.plugin_utils.nuget', 'plugins/plugin_utils/nuget.py')
+    choco_version = load('choco_version', 'plugins/filter/choco_version.py')
+    from ansible.errors import AnsibleError
+    from ansible.plugins.test.core import version_compare
+
+    rng = random.Random(42)
+    pool = generate_versions(args.distinct, rng)
+    pairs = [(rng.choice(pool), rng.choice(pool)) for dummy in range(args.pairs)]
+    release_pairs = [(a, b) for a, b in pairs if '-' not in a and '-' not in b]
+
+    print('%d pairs of %d distinct versions' % (args.pairs, args.distinct))
+    measure(nuget, choco_version, version_compare, AnsibleError, pairs, args.iterations)
+
+    print('')
+    print('%d pairs of release versions only' % len(release_pairs))
+    measure(nuget, choco_version, version_compare, AnsibleError, release_pairs, args.iterations)
+
+
+def measure(nuget, choco_version, version_compare, error_type, pairs, iterations):
+    left = [a for a, dummy in pairs]
+    right = [b for dummy, b in pairs]
+    failures = []
+
+    def ansible_version_test():
+        # The loose version type is the only one that accepts every NuGet version, though it doesn't order
+        # prereleases the way NuGet does, and fails to compare a prerelease part with a number.
+        del failures[:]
+        results = []
+        for a, b in pairs:
+            try:
+                results.append(version_compare(a, b, '<', version_type='loose'))
+            except error_type:
+                failures.append((a, b))
+                results.append(None)
+
+        return results
+
+    def filter_cold():
+        nuget.version_key.cache_clear()
+        return choco_version.choco_version_compare(left, right, '<')
+
+    def filter_warm():
+        return choco_version.choco_version_compare(left, right, '<')
+
+    def uncached_key():
+        key = nuget.version_key.__wrapped__
+        return [key(a) < key(b) for a, b in zip(left, right)]
+
+    filter_warm()
+    results = [
+        ('ansible version test', ansible_version_test),
+        ('choco_version_compare (no memoization)', uncached_key),
+        ('choco_version_compare (cold cache)', filter_cold),
+        ('choco_version_compare (warm cache)', filter_warm),
+    ]
+
+    baseline = None
+    for name, func in results:
+        seconds = min(timeit.repeat(func, number=1, repeat=iterations))
+        baseline = baseline or seconds
+        print('%-42s %8.1f ms %6.1fx' % (name, seconds * 1000, baseline / seconds))
+
+    print('%-42s %8d of %d' % ('pairs the version test failed to compare', len(failures), len(pairs)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2020, Chocolatey Software
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible.module_utils.common.text.converters import to_text
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.action import ActionBase
+from ansible.utils.vars import merge_hash
+
+
+# Options that make the module act on packages even when they are already installed,
+# or that are validated against the installed Chocolatey CLI version on the host.
+_ALWAYS_RUN_OPTIONS = ('allow_multiple', 'force', 'ignore_pinned')
+
+
+class ActionModule(ActionBase):
+
+    def run(self, tmp=None, task_vars=None):
+        self._supports_check_mode = True
+        self._supports_async = True
+
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+
+        task_vars = task_vars or {}
+        args = self._task.args
+
+        if boolean(args.get('inventory_cache', False), strict=False):
+            inventory = self._get_inventory(task_vars)
+
+            if inventory is not None and self._is_satisfied(args, inventory):
+                result.update(
+                    changed=False,
+                    cached=True,
+                    rc=0,
+                    msg='All packages are already present according to the ansible_chocolatey_inventory fact',
+                )
+                return result
+
+        wrap_async = self._task.async_val and not self._connection.has_native_async
+        return merge_hash(result, self._execute_module(task_vars=task_vars, wrap_async=wrap_async))
+
+    @staticmethod
+    def _get_inventory(task_vars):
+        inventory = task_vars.get('ansible_facts', {}).get('chocolatey_inventory')
+        if inventory is None:
+            inventory = task_vars.get('ansible_chocolatey_inventory')
+
+        if not isinstance(inventory, dict):
+            return None
+
+        # Package IDs are case insensitive on the host, so they are compared the same way here.
+        return dict(
+            (to_text(package).lower(), [to_text(v).lower() for v in (versions or [])])
+            for package, versions in inventory.items()
+        )
+
+    @staticmethod
+    def _is_satisfied(args, inventory):
+        for option in _ALWAYS_RUN_OPTIONS:
+            if boolean(args.get(option, False), strict=False):
+                return False
+
+        names = args.get('name')
+        packages = args.get('packages')
+        if (names is None) == (packages is None):
+            # Let the module report that exactly one of these is required.
+            return False
+
+        state = args.get('state') or 'present'
+        version = args.get('version')
+        pinned = args.get('pinned')
+
+        if packages is not None:
+            if not isinstance(packages, list):
+                return False
+
+            entries = []
+            for entry in packages:
+                if not isinstance(entry, dict) or not entry.get('name'):
+                    return False
+
+                entries.append((
+                    entry['name'],
+                    entry.get('state') or state,
+                    entry.get('version') if entry.get('version') is not None else version,
+                    entry.get('pinned') if entry.get('pinned') is not None else pinned,
+                ))
+        else:
+            if not isinstance(names, list):
+                names = [n.strip() for n in to_text(names).split(',')]
+
+            entries = [(n, state, version, pinned) for n in names]
+
+        if not entries:
+            return False
+
+        for name, entry_state, entry_version, entry_pinned in entries:
+            # Pins aren't part of the inventory, and 'all' is resolved by choco.exe on the host.
+            if entry_state != 'present' or entry_pinned is not None or to_text(name).lower() == 'all':
+                return False
+
+            installed = inventory.get(to_text(name).lower())
+            if not installed:
+                return False
+
+            if entry_version is not None and to_text(entry_version).lower() not in installed:
+                return False
+
+        return True
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2020, Chocolatey Software
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: choco_timings
+type: aggregate
+short_description: Summarise the time hosts spend running Chocolatey
+description:
+- Collects the C(choco_timings) returned by the modules in this collection, and
+  adds them up per host, per package, per module, and per phase.
+- At the end of each play, shows the percentiles of the time spent in each phase
+  and module across hosts, along with the slowest hosts and packages.
+- Can also write the totals for the whole run as an OpenMetrics text file, for
+  the Prometheus node exporter textfile collector to pick up.
+version_added: '1.7.0'
+requirements:
+- Enable the callback with C(callbacks_enabled = chocolatey.chocolatey.choco_timings)
+  in the C([defaults]) section of C(ansible.cfg).
+options:
+  top:
+    description:
+    - The number of slowest hosts and packages to show.
+    type: int
+    default: 10
+    env:
+    - name: CHOCOLATEY_TIMINGS_TOP
+    ini:
+    - section: callback_choco_timings
+      key: top
+  percentiles:
+    description:
+    - The percentiles of the time spent across hosts to show, and to write to
+      I(output_path).
+    type: list
+    elements: float
+    default: [50, 90, 99]
+    env:
+    - name: CHOCOLATEY_TIMINGS_PERCENTILES
+    ini:
+    - section: callback_choco_timings
+      key: percentiles
+  output_path:
+    description:
+    - The path of an OpenMetrics text file to write the timings to, such as a
+      file in the directory read by the node exporter textfile collector.
+    - The file is replaced at the end of each play, so it always holds the
+      totals for the run so far.
+    - The file is not written when this is not set.
+    type: path
+    env:
+    - name: CHOCOLATEY_TIMINGS_OUTPUT_PATH
+    ini:
+    - section: callback_choco_timings
+      key: output_path
+notes:
+- The time of a task that manages more than one package is shared equally
+  between those packages.
+- Tasks skipped on the controller with I(inventory_cache) do not run Chocolatey,
+  and are not counted.
+'''
+
+import os
+import tempfile
+
+from ansible.module_utils.common.text.converters import to_bytes, to_text
+from ansible.module_utils.six import string_types
+from ansible.plugins.callback import CallbackBase
+
+
+def _percentile(values, percent):
+    """Returns the given percentile of the values, interpolating between the closest ranks."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+
+    rank = (len(ordered) - 1) * percent / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def _escape_label(value):
+    return to_text(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _task_packages(result, task):
+    """Returns the names of the packages a win_chocolatey task managed on a host."""
+    args = result.get('invocation', {}).get('module_args') or task.args or {}
+
+    packages = args.get('packages')
+    if isinstance(packages, list):
+        return [to_text(p['name']).lower() for p in packages if isinstance(p, dict) and p.get('name')]
+
+    names = args.get('name')
+    if isinstance(names, string_types):
+        names = names.split(',')
+
+    if isinstance(names, list):
+        return [to_text(n).strip().lower() for n in names if to_text(n).strip()]
+
+    return []
+
+
+class _Timings:
+    """The total seconds spent per host, package, module, and phase."""
+
+    def __init__(self):
+        self.hosts = {}
+        self.packages = {}
+        # Keyed by (module, host) and (phase, host), so the percentiles are taken across hosts.
+        self.modules = {}
+        self.phases = {}
+        self.commands = {}
+
+    @staticmethod
+    def _add(totals, key, seconds):
+        totals[key] = totals.get(key, 0.0) + seconds
+
+    def add(self, host, module, packages, timings):
+        commands = timings.get('commands') or []
+        seconds = sum(float(c.get('seconds') or 0) for c in commands)
+
+        self._add(self.hosts, host, seconds)
+        self._add(self.modules, (module, host), seconds)
+
+        for command in commands:
+            self._add(self.commands, (to_text(command.get('label')), host), float(command.get('seconds') or 0))
+
+        for phase, phase_seconds in (timings.get('phases') or {}).items():
+            self._add(self.phases, (to_text(phase), host), float(phase_seconds or 0))
+
+        for package in packages:
+            self._add(self.packages, package, seconds / len(packages))
+
+    def update(self, other):
+        for name in ('hosts', 'packages', 'modules', 'phases', 'commands'):
+            totals = getattr(self, name)
+            for key, seconds in getattr(other, name).items():
+                self._add(totals, key, seconds)
+
+    def __bool__(self):
+        return bool(self.hosts)
+
+    __nonzero__ = __bool__
+
+    @staticmethod
+    def by_name(totals):
+        """Groups totals keyed by (name, host) into a list of the host totals for each name."""
+        grouped = {}
+        for (name, dummy), seconds in totals.items():
+            grouped.setdefault(name, []).append(seconds)
+
+        return grouped
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'chocolatey.chocolatey.choco_timings'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+
+        self._play = _Timings()
+        self._run = _Timings()
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+
+        self._top = self.get_option('top')
+        self._percentiles = [float(p) for p in self.get_option('percentiles')]
+        self._output_path = self.get_option('output_path')
+
+    def _record(self, result):
+        task_result = result._result
+        results = task_result.get('results') if isinstance(task_result.get('results'), list) else [task_result]
+        module = result._task.action
+        host = result._host.get_name()
+
+        for item in results:
+            timings = item.get('choco_timings') if isinstance(item, dict) else None
+            if not isinstance(timings, dict):
+                continue
+
+            packages = _task_packages(item, result._task) if module.endswith('win_chocolatey') else []
+            self._play.add(host, module, packages, timings)
+
+    def v2_runner_on_ok(self, result):
+        self._record(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record(result)
+
+    def v2_playbook_on_play_start(self, play):
+        self._end_play()
+
+    def v2_playbook_on_stats(self, stats):
+        self._end_play()
+
+    def _end_play(self):
+        if not self._play:
+            return
+
+        self._display_summary(self._play)
+        self._run.update(self._play)
+        self._play = _Timings()
+
+        if self._output_path:
+            self._write_metrics(self._run)
+
+    def _display_summary(self, timings):
+        columns = ''.join(' p%-9s' % ('%g' % p) for p in self._percentiles)
+
+        self._display.banner('CHOCOLATEY TIMINGS')
+        for title, totals in (('Phase', timings.phases), ('Command', timings.commands), ('Module', timings.modules)):
+            grouped = _Timings.by_name(totals)
+            if not grouped:
+                continue
+
+            self._display.display('%-40s %6s%s' % (title, 'hosts', columns))
+            for name in sorted(grouped):
+                values = ''.join(' %-10.2f' % _percentile(grouped[name], p) for p in self._percentiles)
+                self._display.display('%-40s %6d%s' % (name, len(grouped[name]), values))
+            self._display.display('')
+
+        for title, totals in (('Slowest hosts', timings.hosts), ('Slowest packages', timings.packages)):
+            if not totals:
+                continue
+
+            self._display.display(title)
+            slowest = sorted(totals.items(), key=lambda i: i[1], reverse=True)[:self._top]
+            for name, seconds in slowest:
+                self._display.display('  %-60s %10.2fs' % (name, seconds))
+            self._display.display('')
+
+    def _write_metrics(self, timings):
+        lines = []
+
+        def add_summary(metric, help_text, label, totals):
+            lines.append('# HELP %s %s' % (metric, help_text))
+            lines.append('# TYPE %s summary' % metric)
+            for name, values in sorted(_Timings.by_name(totals).items()):
+                for percent in self._percentiles:
+                    lines.append('%s{%s="%s",quantile="%g"} %f' % (
+                        metric, label, _escape_label(name), percent / 100.0, _percentile(values, percent)))
+                lines.append('%s_sum{%s="%s"} %f' % (metric, label, _escape_label(name), sum(values)))
+                lines.append('%s_count{%s="%s"} %d' % (metric, label, _escape_label(name), len(values)))
+
+        def add_gauge(metric, help_text, label, totals):
+            lines.append('# HELP %s %s' % (metric, help_text))
+            lines.append('# TYPE %s gauge' % metric)
+            for name, seconds in sorted(totals.items()):
+                lines.append('%s{%s="%s"} %f' % (metric, label, _escape_label(name), seconds))
+
+        add_summary('chocolatey_phase_seconds', 'Time each host spent in a phase of the Chocolatey modules.',
+                    'phase', timings.phases)
+        add_summary('chocolatey_command_seconds', 'Time each host spent running choco.exe, by kind of command.',
+                    'command', timings.commands)
+        add_summary('chocolatey_module_seconds', 'Time each host spent running choco.exe, by module.',
+                    'module', timings.modules)
+        add_gauge('chocolatey_host_seconds', 'Time the host spent running choco.exe.', 'host', timings.hosts)
+        add_gauge('chocolatey_package_seconds', 'Time spent running choco.exe for the package across all hosts.',
+                  'package', timings.packages)
+        lines.append('# EOF')
+
+        # The textfile collector may read the file at any time, so it is written to a temporary file and then
+        # moved over the existing one.
+        path = to_bytes(self._output_path, errors='surrogate_or_strict')
+        directory = os.path.dirname(path) or b'.'
+        temp_path = None
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=b'.choco_timings')
+            with os.fdopen(fd, 'wb') as metrics_file:
+                metrics_file.write(to_bytes('\n'.join(lines) + '\n'))
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except (IOError, OSError) as e:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            self._display.warning('Failed to write Chocolatey timings to %s: %s' % (self._output_path, to_text(e)))
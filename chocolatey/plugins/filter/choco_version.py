@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2020, Chocolatey Software
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Filters for comparing Chocolatey package versions the way NuGet orders them.
+
+Unlike the version test, four part versions and prereleases are ordered the same way
+Chocolatey orders them. Each filter works on a whole list in one call, so comparing the
+versions in the facts of many hosts doesn't need a loop in Jinja.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import operator
+
+from ansible.errors import AnsibleFilterError
+from ansible.module_utils.common.text.converters import to_native, to_text
+from ansible.module_utils.six import string_types
+
+from ansible_collections.chocolatey.chocolatey.plugins.plugin_utils.nuget import version_key
+
+
+_OPERATORS = {
+    '==': operator.eq,
+    '=': operator.eq,
+    'eq': operator.eq,
+    '!=': operator.ne,
+    '<>': operator.ne,
+    'ne': operator.ne,
+    '<': operator.lt,
+    'lt': operator.lt,
+    '<=': operator.le,
+    'le': operator.le,
+    '>': operator.gt,
+    'gt': operator.gt,
+    '>=': operator.ge,
+    'ge': operator.ge,
+}
+
+
+def _key(version):
+    try:
+        return version_key(to_text(version))
+    except ValueError as e:
+        raise AnsibleFilterError(to_native(e))
+
+
+def _cmp(left, right):
+    return (left > right) - (left < right)
+
+
+def choco_version_compare(value, other, op=None):
+    """Compares versions, returning -1, 0, or 1, or a bool if an operator such as '<' or 'ge' is given.
+
+    Either side can be a list of versions, which are compared pairwise if both are lists,
+    or all against the single version on the other side, and a list of results is returned.
+    """
+    if op is None:
+        compare = _cmp
+    elif op in _OPERATORS:
+        compare = _OPERATORS[op]
+    else:
+        raise AnsibleFilterError("choco_version_compare: unknown operator '%s', expected one of %s"
+                                 % (op, ', '.join(sorted(_OPERATORS))))
+
+    value_is_list = not isinstance(value, string_types) and isinstance(value, (list, tuple))
+    other_is_list = not isinstance(other, string_types) and isinstance(other, (list, tuple))
+
+    if value_is_list and other_is_list:
+        if len(value) != len(other):
+            raise AnsibleFilterError('choco_version_compare: cannot compare %d versions pairwise with %d versions'
+                                     % (len(value), len(other)))
+
+        return [compare(_key(left), _key(right)) for left, right in zip(value, other)]
+
+    if value_is_list:
+        other_key = _key(other)
+        return [compare(_key(left), other_key) for left in value]
+
+    if other_is_list:
+        value_key = _key(value)
+        return [compare(value_key, _key(right)) for right in other]
+
+    return compare(_key(value), _key(other))
+
+
+def choco_version_max(versions, allow_prerelease=True):
+    """Returns the highest version in the list, or None if it is empty."""
+    candidates = [(_key(version), version) for version in versions]
+    if not allow_prerelease:
+        candidates = [candidate for candidate in candidates if candidate[0][4] == 1]
+
+    if not candidates:
+        return None
+
+    return max(candidates, key=operator.itemgetter(0))[1]
+
+
+def choco_version_sort(versions, reverse=False):
+    """Returns the versions in order, lowest first unless reverse is set."""
+    return sorted(versions, key=_key, reverse=reverse)
+
+
+def choco_outdated_filter(outdated, packages=None, ignore_pinned=False, allow_prerelease=True):
+    """Returns the records from the outdated Chocolatey facts that have a newer version available.
+
+    Records where the available version isn't higher than the current version are left
+    out, as are pinned packages unless ignore_pinned is set, and prerelease versions unless
+    allow_prerelease is set. If packages is given, only records for those packages are kept.
+    """
+    if packages is not None:
+        if isinstance(packages, string_types):
+            packages = [packages]
+        packages = set(to_text(package).lower() for package in packages)
+
+    result = []
+    for record in outdated:
+        try:
+            package = to_text(record['package'])
+            current = _key(record['current_version'])
+            available = _key(record['available_version'])
+        except (KeyError, TypeError):
+            raise AnsibleFilterError('choco_outdated_filter: expected records with package, current_version, and '
+                                     'available_version keys, got %s' % to_native(record))
+
+        if packages is not None and package.lower() not in packages:
+            continue
+
+        if record.get('pinned') and not ignore_pinned:
+            continue
+
+        if available[4] == 0 and not allow_prerelease:
+            continue
+
+        if available > current:
+            result.append(record)
+
+    return result
+
+
+class FilterModule(object):
+
+    def filters(self):
+        return {
+            'choco_outdated_filter': choco_outdated_filter,
+            'choco_version_compare': choco_version_compare,
+            'choco_version_max': choco_version_max,
+            'choco_version_sort': choco_version_sort,
+        }
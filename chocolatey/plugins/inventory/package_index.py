@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2020, Chocolatey Software
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: package_index
+short_description: Group hosts by the Chocolatey packages they have installed
+description:
+- Builds an index of the Chocolatey packages installed on the hosts already
+  in the inventory, from the facts gathered by
+  M(chocolatey.chocolatey.win_chocolatey_facts) or the
+  C(ansible_chocolatey_inventory) fact returned by
+  M(chocolatey.chocolatey.win_chocolatey), as kept in the fact cache.
+- Adds hosts to groups for each installed version of a package, and to
+  groups for hosts with a version of a package in a NuGet version range, such
+  as the hosts running git below 2.45.
+- Versions are ordered the way NuGet and Chocolatey order them, including
+  four part versions and prereleases.
+- Like M(ansible.builtin.constructed), this plugin only adds groups and
+  variables to hosts from earlier inventory sources, so it must be listed
+  after them.
+- The inventory file must be named C(chocolatey.yml) or C(chocolatey.yaml),
+  or end with C(.chocolatey.yml) or C(.chocolatey.yaml).
+version_added: '1.7.0'
+extends_documentation_fragment:
+- constructed
+options:
+  plugin:
+    description: The name of this plugin, so Ansible knows to use it for this file.
+    type: str
+    required: true
+    choices: [ chocolatey.chocolatey.package_index ]
+  index_var:
+    description:
+    - "The name of the variable set on the C(all) group with the index of the
+      hosts that have each version of each package installed, as
+      C({package: {version: [hosts]}})."
+    - Package IDs are lowercase, and the versions are in ascending order.
+    - Set to an empty string to not set the variable.
+    type: str
+    default: chocolatey_package_index
+  host_var:
+    description:
+    - "The name of the variable set on each host with the versions of each
+      package installed on it, as C({package: [versions]})."
+    - This variable can be used by I(compose), I(groups), and I(keyed_groups).
+    - Set to an empty string to not set the variable.
+    type: str
+    default: chocolatey_packages
+  version_groups:
+    description:
+    - The packages to add hosts to a group for each installed version of.
+    - Hosts are added to C(<prefix>_<version>) for each version they have installed.
+    type: list
+    elements: dict
+    default: []
+    suboptions:
+      package:
+        description: The ID of the package.
+        type: str
+        required: true
+      prefix:
+        description: The prefix of the group names, defaults to C(chocolatey_<package>).
+        type: str
+  range_groups:
+    description:
+    - Groups of hosts that have a version of a package installed in a NuGet
+      version range.
+    type: list
+    elements: dict
+    default: []
+    suboptions:
+      name:
+        description: The name of the group.
+        type: str
+        required: true
+      package:
+        description: The ID of the package.
+        type: str
+        required: true
+      range:
+        description:
+        - The NuGet version range, such as C((,2.45\)) for any version below
+          2.45, C([2.45,3.0\)) for 2.45 or later but below 3.0, or C(2.45)
+          for 2.45 or later.
+        - Prerelease versions are compared like any other version.
+        type: str
+        required: true
+notes:
+- Facts are only read from the fact cache, so C(fact_caching) must be
+  configured, and facts gathered in an earlier run.
+'''
+
+EXAMPLES = r'''
+# inventory/90-fleet.chocolatey.yml, listed after the sources that add the hosts
+plugin: chocolatey.chocolatey.package_index
+version_groups:
+- package: chocolatey
+range_groups:
+- name: outdated_git
+  package: git
+  range: (,2.45)
+keyed_groups:
+- key: chocolatey_packages.keys() | list
+  prefix: has
+'''
+
+from ansible import constants as C
+from ansible.errors import AnsibleParserError
+from ansible.inventory.group import to_safe_group_name
+from ansible.module_utils.common.text.converters import to_native, to_text
+from ansible.plugins.inventory import BaseInventoryPlugin, Constructable
+from ansible.plugins.loader import cache_loader
+from ansible.utils.vars import combine_vars
+
+from ansible_collections.chocolatey.chocolatey.plugins.plugin_utils.nuget import VersionRange, version_key
+
+
+def _host_packages(facts):
+    """Returns the package versions installed on a host, as {package: [versions]}, from its cached facts."""
+    packages = {}
+
+    # The facts can be cached with or without the ansible_ prefix, depending on how they were set.
+    chocolatey = facts.get('ansible_chocolatey') or facts.get('chocolatey')
+    inventory = facts.get('ansible_chocolatey_inventory') or facts.get('chocolatey_inventory')
+
+    if isinstance(chocolatey, dict) and isinstance(chocolatey.get('packages'), list):
+        for package in chocolatey['packages']:
+            if isinstance(package, dict) and package.get('package') and package.get('version'):
+                packages.setdefault(to_text(package['package']).lower(), set()).add(to_text(package['version']))
+    elif isinstance(inventory, dict):
+        for package, versions in inventory.items():
+            packages[to_text(package).lower()] = set(to_text(v) for v in versions or [])
+
+    return dict((package, _sorted_versions(versions)) for package, versions in packages.items())
+
+
+def _sorted_versions(versions):
+    def key(version):
+        try:
+            return (1, version_key(version))
+        except ValueError:
+            # Anything that isn't a valid version sorts before the rest.
+            return (0, version)
+
+    return sorted(versions, key=key)
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable):
+
+    NAME = 'chocolatey.chocolatey.package_index'
+
+    def verify_file(self, path):
+        if super(InventoryModule, self).verify_file(path):
+            return path.endswith(('chocolatey.yml', 'chocolatey.yaml'))
+
+        return False
+
+    def parse(self, inventory, loader, path, cache=False):
+        super(InventoryModule, self).parse(inventory, loader, path, cache=cache)
+
+        self._read_config_data(path)
+
+        range_groups = []
+        for group in self.get_option('range_groups'):
+            try:
+                range_groups.append((group['name'], to_text(group['package']).lower(), VersionRange(group['range'])))
+            except ValueError as e:
+                raise AnsibleParserError("Invalid range for the range group '%s': %s" % (group['name'], to_native(e)))
+
+        version_groups = [
+            (to_text(group['package']).lower(), group.get('prefix') or 'chocolatey_%s' % group['package'])
+            for group in self.get_option('version_groups')
+        ]
+
+        strict = self.get_option('strict')
+        # The fact cache plugin configured for the run, the same one that the facts are read from by the tasks.
+        fact_cache = cache_loader.get(C.CACHE_PLUGIN)
+        if fact_cache is None:
+            raise AnsibleParserError("Unable to load the fact cache plugin '%s'" % C.CACHE_PLUGIN)
+
+        index = {}
+
+        for name, host in inventory.hosts.items():
+            try:
+                facts = fact_cache.get(name) or {}
+            except KeyError:
+                facts = {}
+
+            packages = _host_packages(facts)
+            for package, versions in packages.items():
+                for version in versions:
+                    index.setdefault(package, {}).setdefault(version, []).append(name)
+
+            if self.get_option('host_var'):
+                inventory.set_variable(name, self.get_option('host_var'), packages)
+
+            for package, prefix in version_groups:
+                for version in packages.get(package, []):
+                    group = inventory.add_group(to_safe_group_name('%s_%s' % (prefix, version), force=True, silent=True))
+                    inventory.add_child(group, name)
+
+            for group_name, package, version_range in range_groups:
+                in_range = False
+                for version in packages.get(package, []):
+                    try:
+                        in_range = version in version_range
+                    except ValueError:
+                        continue
+
+                    if in_range:
+                        break
+
+                if in_range:
+                    group = inventory.add_group(to_safe_group_name(group_name, force=True, silent=True))
+                    inventory.add_child(group, name)
+
+            host_vars = combine_vars(host.get_vars(), facts)
+            self._set_composite_vars(self.get_option('compose'), host_vars, name, strict=strict)
+            self._add_host_to_composed_groups(self.get_option('groups'), host_vars, name, strict=strict)
+            self._add_host_to_keyed_groups(self.get_option('keyed_groups'), host_vars, name, strict=strict)
+
+        if self.get_option('index_var'):
+            index = dict(
+                (package, dict((version, sorted(versions[version])) for version in _sorted_versions(versions)))
+                for package, versions in index.items()
+            )
+            inventory.set_variable('all', self.get_option('index_var'), index)
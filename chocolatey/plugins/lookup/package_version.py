@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2020, Chocolatey Software
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: package_version
+short_description: Resolve the latest version of Chocolatey packages on a feed
+description:
+- Looks up the latest version of each package on a NuGet v2 or v3 feed from
+  the controller, so a single resolved version can be installed across every
+  host with M(chocolatey.chocolatey.win_chocolatey), rather than each host
+  resolving C(state=latest) against the feed by itself.
+- Versions are ordered the way NuGet and Chocolatey order them, including
+  four part versions and prereleases.
+- The versions on the feed are cached on the controller. Within I(cache_ttl)
+  the cached versions are used without contacting the feed, so every host in
+  a play resolves to the same version even while a new one is published.
+  After that the feed is asked for the package again with the C(ETag) it last
+  returned, and the cached versions are kept if it has not changed.
+version_added: '1.7.0'
+options:
+  _terms:
+    description:
+    - The IDs of the packages to look up.
+    type: list
+    elements: str
+    required: true
+  source:
+    description:
+    - The URL of the feed to look the packages up on.
+    - A URL ending in C(index.json) is used as a NuGet v3 service index,
+      any other URL as a NuGet v2 feed.
+    type: str
+    default: https://community.chocolatey.org/api/v2/
+  allow_prerelease:
+    description:
+    - Whether to resolve to a prerelease version if it is the latest version.
+    type: bool
+    default: false
+  source_username:
+    description:
+    - The username to authenticate to the feed with.
+    type: str
+  source_password:
+    description:
+    - The password to authenticate to the feed with.
+    type: str
+  validate_certs:
+    description:
+    - Whether to validate the certificate of the feed.
+    type: bool
+    default: true
+  timeout:
+    description:
+    - The number of seconds to wait for each response from the feed.
+    type: int
+    default: 30
+  cache_ttl:
+    description:
+    - The number of seconds the cached versions of a package are used without
+      revalidating them with the feed.
+    - Set to C(0) to revalidate them on every lookup.
+    type: int
+    default: 300
+  cache_path:
+    description:
+    - The directory on the controller to cache the versions of each package in.
+    type: path
+    default: ~/.ansible/cache/chocolatey_package_version
+notes:
+- Lookups are run separately for each host, in different worker processes,
+  the cache is kept on disk so it is shared between them.
+- Unlisted package versions are left out, as Chocolatey does not install
+  them unless asked for by version. On NuGet v3 feeds the versions are read
+  from the package metadata resource, and only from the package content
+  resource if the feed does not have one. That resource does not say which
+  versions are unlisted, so they are included.
+'''
+
+EXAMPLES = r'''
+- name: Install the same latest version of git on every host
+  chocolatey.chocolatey.win_chocolatey:
+    name: git
+    version: "{{ lookup('chocolatey.chocolatey.package_version', 'git') }}"
+
+- name: Resolve versions from an internal NuGet v3 feed
+  ansible.builtin.set_fact:
+    tool_versions: "{{ dict(tools | zip(query('chocolatey.chocolatey.package_version', *tools, source=feed_url))) }}"
+  vars:
+    tools: [ git, putty ]
+    feed_url: https://internal-repo/repository/chocolatey/index.json
+  run_once: true
+'''
+
+RETURN = r'''
+_list:
+  description:
+  - The latest version of each package, in the same order as the terms.
+  type: list
+  elements: str
+'''
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from ansible.errors import AnsibleLookupError
+from ansible.module_utils.common.text.converters import to_bytes, to_native, to_text
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible.module_utils.six.moves.urllib.parse import quote
+from ansible.module_utils.urls import open_url
+from ansible.plugins.lookup import LookupBase
+from ansible.utils.display import Display
+
+from ansible_collections.chocolatey.chocolatey.plugins.plugin_utils.nuget import latest_version
+
+display = Display()
+
+_ATOM = '{http://www.w3.org/2005/Atom}'
+_METADATA = '{http://schemas.microsoft.com/ado/2007/08/dataservices/metadata}'
+_DATA = '{http://schemas.microsoft.com/ado/2007/08/dataservices}'
+
+# The package metadata resources, in order of preference. The later versions also include SemVer 2.0.0 packages.
+_REGISTRATIONS_TYPES = (
+    'RegistrationsBaseUrl/3.6.0',
+    'RegistrationsBaseUrl/Versioned',
+    'RegistrationsBaseUrl/3.4.0',
+    'RegistrationsBaseUrl/3.0.0-rc',
+    'RegistrationsBaseUrl/3.0.0-beta',
+    'RegistrationsBaseUrl',
+)
+
+
+class LookupModule(LookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+
+        self._source = self.get_option('source')
+        self._cache_path = self.get_option('cache_path')
+        self._cache_ttl = self.get_option('cache_ttl')
+
+        results = []
+        for term in terms:
+            versions = self._get_versions(to_text(term))
+            version = latest_version(versions, allow_prerelease=self.get_option('allow_prerelease'))
+            if version is None:
+                raise AnsibleLookupError("No versions of package '%s' were found on '%s'" % (term, self._source))
+
+            results.append(version)
+
+        return results
+
+    def _get_versions(self, package):
+        if self._source.rstrip('/').endswith('index.json'):
+            return self._get_v3_versions(package)
+
+        url = "%s/FindPackagesById()?id='%s'" % (self._source.rstrip('/'), quote(package))
+        versions = []
+
+        # Each page of a v2 feed is cached and revalidated by itself, following the next links the feed returns.
+        while url:
+            page_versions, url = self._get_cached(url, self._parse_v2_page)
+            versions.extend(page_versions)
+
+        return versions
+
+    def _get_v3_versions(self, package):
+        resources = self._get_cached(self._source, self._parse_v3_index)
+
+        registrations_url = None
+        for resource_type in _REGISTRATIONS_TYPES:
+            if resource_type in resources:
+                registrations_url = resources[resource_type]
+                break
+
+        if registrations_url is None:
+            base_address = resources.get('PackageBaseAddress/3.0.0')
+            if base_address is None:
+                raise AnsibleLookupError("The NuGet v3 feed '%s' does not have a RegistrationsBaseUrl or "
+                                         "PackageBaseAddress resource" % self._source)
+
+            # The package content resource returns a 404 for packages it does not have any versions of.
+            url = '%s/%s/index.json' % (base_address.rstrip('/'), quote(package.lower()))
+            return self._get_cached(url, lambda content: json.loads(to_text(content)).get('versions', []), not_found=[])
+
+        url = '%s/%s/index.json' % (registrations_url.rstrip('/'), quote(package.lower()))
+        versions = []
+
+        # Large registrations only link to their pages rather than including them, each of those pages is cached and
+        # revalidated by itself.
+        for page_url, page_versions in self._get_cached(url, self._parse_registration_index, not_found=[]):
+            if page_versions is None:
+                page_versions = self._get_cached(page_url, self._parse_registration_page)
+
+            versions.extend(page_versions)
+
+        return versions
+
+    @staticmethod
+    def _parse_v3_index(content):
+        resources = {}
+        for resource in json.loads(to_text(content)).get('resources', []):
+            resources.setdefault(to_text(resource.get('@type')), resource.get('@id'))
+
+        return resources
+
+    @staticmethod
+    def _parse_registration_leaves(items):
+        versions = []
+        for item in items or []:
+            entry = item.get('catalogEntry')
+            if not isinstance(entry, dict) or not entry.get('version'):
+                continue
+
+            # Versions are listed unless the feed says otherwise.
+            if entry.get('listed', True) is False:
+                continue
+
+            versions.append(to_text(entry['version']))
+
+        return versions
+
+    @classmethod
+    def _parse_registration_index(cls, content):
+        pages = []
+        for page in json.loads(to_text(content)).get('items', []):
+            versions = cls._parse_registration_leaves(page['items']) if 'items' in page else None
+            pages.append((page.get('@id'), versions))
+
+        return pages
+
+    @classmethod
+    def _parse_registration_page(cls, content):
+        return cls._parse_registration_leaves(json.loads(to_text(content)).get('items', []))
+
+    @staticmethod
+    def _parse_v2_page(content):
+        try:
+            feed = ET.fromstring(content)
+        except ET.ParseError as e:
+            raise AnsibleLookupError('Failed to parse the NuGet v2 feed response: %s' % to_native(e))
+
+        versions = []
+        for entry in feed.iter(_ATOM + 'entry'):
+            properties = entry.find('.//%sproperties' % _METADATA)
+            if properties is None:
+                continue
+
+            # Unlisted versions are published on 1900-01-01.
+            published = properties.find(_DATA + 'Published')
+            if published is not None and to_text(published.text).startswith('1900-'):
+                continue
+
+            version = properties.find(_DATA + 'Version')
+            if version is not None and version.text:
+                versions.append(to_text(version.text))
+
+        next_url = None
+        for link in feed.findall(_ATOM + 'link'):
+            if link.get('rel') == 'next':
+                next_url = link.get('href')
+
+        return versions, next_url
+
+    def _get_cached(self, url, parse, not_found=None):
+        """Returns the parsed response for the URL, from the cache if it is still fresh or has not changed.
+
+        If not_found is set, it is returned when the URL does not exist rather than failing.
+        """
+        cache_file = os.path.join(
+            os.path.expanduser(self._cache_path),
+            hashlib.sha256(to_bytes(url)).hexdigest() + '.json',
+        )
+
+        cached = None
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = json.loads(to_text(f.read()))
+        except (IOError, OSError, ValueError):
+            pass
+
+        if cached is not None and time.time() - cached.get('fetched', 0) < self._cache_ttl:
+            return cached['value']
+
+        headers = {'Accept': 'application/json, application/atom+xml, application/xml'}
+        if cached is not None and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+
+        try:
+            response = open_url(
+                url,
+                headers=headers,
+                url_username=self.get_option('source_username'),
+                url_password=self.get_option('source_password'),
+                force_basic_auth=bool(self.get_option('source_username')),
+                validate_certs=self.get_option('validate_certs'),
+                timeout=self.get_option('timeout'),
+            )
+            content = response.read()
+            etag = response.headers.get('ETag')
+        except HTTPError as e:
+            if e.code == 304 and cached is not None:
+                display.vvvv('package_version: %s has not changed' % url)
+                cached['fetched'] = time.time()
+                self._write_cache(cache_file, cached)
+                return cached['value']
+
+            if e.code == 404 and not_found is not None:
+                return not_found
+
+            raise AnsibleLookupError('Failed to get %s: HTTP Error %s: %s' % (url, e.code, to_native(e.reason)))
+        except Exception as e:
+            raise AnsibleLookupError('Failed to get %s: %s' % (url, to_native(e)))
+
+        value = parse(content)
+        self._write_cache(cache_file, {'etag': etag, 'fetched': time.time(), 'value': value})
+
+        return value
+
+    @staticmethod
+    def _write_cache(cache_file, data):
+        # Other worker processes may be reading the cache at the same time, so it is replaced rather than rewritten.
+        directory = os.path.dirname(cache_file)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory, exist_ok=True)
+
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(to_bytes(json.dumps(data)))
+            os.replace(temp_path, cache_file)
+        except (IOError, OSError) as e:
+            display.warning('Failed to cache the Chocolatey package versions in %s: %s' % (cache_file, to_native(e)))
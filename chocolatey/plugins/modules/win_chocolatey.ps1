@@ -11,6 +11,7 @@
 
 #AnsibleRequires -CSharpUtil Ansible.Basic
 #AnsibleRequires -PowerShell ansible_collections.chocolatey.chocolatey.plugins.module_utils.Common
+#AnsibleRequires -PowerShell ansible_collections.chocolatey.chocolatey.plugins.module_utils.Jobs
 #AnsibleRequires -PowerShell ansible_collections.chocolatey.chocolatey.plugins.module_utils.Packages
 
 [Diagnostics.CodeAnalysis.SuppressMessageAttribute(
@@ -33,7 +34,10 @@ function Get-ModuleSpec {
             allow_multiple        = @{ type = "bool"; default = $false; removed_in_version = '2.0.0'; removed_from_collection = 'chocolatey.chocolatey' }
             allow_prerelease      = @{ type = "bool"; default = $false }
             architecture          = @{ type = "str"; default = "default"; choices = "default", "x86" }
+            bootstrap_package     = @{ type = "path" }
+            bootstrap_package_checksum = @{ type = "str" }
             bootstrap_script      = @{ type = "str"; aliases = "install_ps1", "bootstrap_ps1" }
+            bootstrap_script_checksum = @{ type = "str" }
             bootstrap_tls_version = @{
                 type = "list"
                 elements = "str"
@@ -46,15 +50,31 @@ function Get-ModuleSpec {
             checksum_type         = @{ type = "str"; choices = "md5", "sha1", "sha256", "sha512" }
             checksum_type64       = @{ type = "str"; choices = "md5", "sha1", "sha256", "sha512" }
             choco_args            = @{ type = "list"; elements = "str"; aliases = "licensed_args" }
+            detach                = @{ type = "bool"; default = $false }
             force                 = @{ type = "bool"; default = $false }
             ignore_checksums      = @{ type = "bool"; default = $false }
             ignore_dependencies   = @{ type = "bool"; default = $false }
             ignore_pinned         = @{ type = "bool"; default = $false }
             install_args          = @{ type = "str" }
-            name                  = @{ type = "list"; elements = "str"; required = $true }
+            inventory_cache       = @{ type = "bool"; default = $false }
+            name                  = @{ type = "list"; elements = "str" }
+            output_tail           = @{ type = "int"; default = 4096 }
             override_args         = @{ type = "bool"; default = $false }
             package_params        = @{ type = "str"; aliases = @("params") }
+            parallelism           = @{ type = "int"; default = 1 }
+            packages              = @{
+                type = "list"
+                elements = "dict"
+                options = @{
+                    name    = @{ type = "str"; required = $true }
+                    pinned  = @{ type = "bool" }
+                    source  = @{ type = "str" }
+                    state   = @{ type = "str"; choices = "absent", "downgrade", "downloaded", "upgrade", "latest", "present", "reinstalled" }
+                    version = @{ type = "str" }
+                }
+            }
             pinned                = @{ type = "bool" }
+            prefetch              = @{ type = "bool"; default = $false }
             proxy_url             = @{ type = "str" }
             proxy_username        = @{ type = "str" }
             proxy_password        = @{ type = "str"; no_log = $true }
@@ -63,15 +83,56 @@ function Get-ModuleSpec {
             source                = @{ type = "str" }
             source_username       = @{ type = "str" }
             source_password       = @{ type = "str"; no_log = $true }
-            state                 = @{ type = "str"; default = "present"; choices = "absent", "downgrade", "upgrade", "latest", "present", "reinstalled" }
+            spool_output          = @{ type = "bool"; default = $false }
+            state                 = @{ type = "str"; default = "present"; choices = "absent", "downgrade", "downloaded", "upgrade", "latest", "present", "reinstalled" }
             timeout               = @{ type = "int"; default = 2700; aliases = @("execution_timeout") }
+            upgrade_outdated_only = @{ type = "bool"; default = $false }
             validate_certs        = @{ type = "bool"; default = $true }
             version               = @{ type = "str" }
         }
+        mutually_exclusive  = @(
+            # Explicit `,` prefix required to prevent the array unrolling, Ansible requires nested arrays here.
+            @( 'name', 'packages' ),
+            @( 'bootstrap_package', 'bootstrap_script' )
+        )
+        required_one_of     = @(
+            , @( 'name', 'packages' )
+        )
+        required_by         = @{
+            bootstrap_package = 'bootstrap_package_checksum'
+        }
         supports_check_mode = $true
     }
 }
 
+function Set-InventoryFact {
+    <#
+        .SYNOPSIS
+        Returns the installed packages as the `ansible_chocolatey_inventory` fact.
+
+        .DESCRIPTION
+        The action plugin uses the fact to skip running the module for later tasks
+        that are already satisfied by the packages installed on the host.
+    #>
+    [CmdletBinding()]
+    param(
+        # A CommandInfo object containing the path to choco.exe.
+        [Parameter(Mandatory = $true)]
+        [System.Management.Automation.CommandInfo]
+        $ChocoCommand,
+
+        # The module to return the fact from.
+        # Defaults to the currently active module.
+        [Parameter()]
+        [Ansible.Basic.AnsibleModule]
+        $Module = (Get-AnsibleModule)
+    )
+
+    $Module.Result.ansible_facts = @{
+        ansible_chocolatey_inventory = Get-ChocolateyPackageInventory -ChocoCommand $ChocoCommand
+    }
+}
+
 $spec = Get-ModuleSpec
 
 $module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
@@ -81,21 +142,30 @@ $allow_empty_checksums = $module.Params.allow_empty_checksums
 $allow_multiple = $module.Params.allow_multiple
 $allow_prerelease = $module.Params.allow_prerelease
 $architecture = $module.Params.architecture
+$bootstrap_package = $module.Params.bootstrap_package
+$bootstrap_package_checksum = $module.Params.bootstrap_package_checksum
 $bootstrap_script = $module.Params.bootstrap_script
+$bootstrap_script_checksum = $module.Params.bootstrap_script_checksum
 $checksum = $module.Params.checksum
 $checksum64 = $module.Params.checksum64
 $checksum_type = $module.Params.checksum_type
 $checksum_type64 = $module.Params.checksum_type64
 $choco_args = $module.Params.choco_args
+$detach = $module.Params.detach
 $force = $module.Params.force
 $ignore_checksums = $module.Params.ignore_checksums
 $ignore_dependencies = $module.Params.ignore_dependencies
 $ignore_pinned = $module.Params.ignore_pinned
 $install_args = $module.Params.install_args
+$inventory_cache = $module.Params.inventory_cache
 $name = $module.Params.name
+$output_tail = $module.Params.output_tail
 $override_args = $module.Params.override_args
 $package_params = $module.Params.package_params
+$parallelism = $module.Params.parallelism
+$packages = $module.Params.packages
 $pinned = $module.Params.pinned
+$prefetch = $module.Params.prefetch
 $proxy_url = $module.Params.proxy_url
 $proxy_username = $module.Params.proxy_username
 $proxy_password = $module.Params.proxy_password
@@ -104,14 +174,36 @@ $skip_scripts = $module.Params.skip_scripts
 $source = $module.Params.source
 $source_username = $module.Params.source_username
 $source_password = $module.Params.source_password
+$spool_output = $module.Params.spool_output
 $state = $module.Params.state
 $timeout = $module.Params.timeout
+$upgrade_outdated_only = $module.Params.upgrade_outdated_only
 $bootstrap_tls_version = $module.Params.bootstrap_tls_version
 $validate_certs = $module.Params.validate_certs
 $version = $module.Params.version
 
 $module.Result.rc = 0
 
+if ($parallelism -lt 1) {
+    Assert-TaskFailed -Message "Option 'parallelism' must be 1 or greater, got $parallelism"
+}
+
+if ($output_tail -lt 0) {
+    Assert-TaskFailed -Message "Option 'output_tail' must be 0 or greater, got $output_tail"
+}
+
+if ($detach) {
+    # Pins are set once the packages are installed, and prefetched packages are removed once they have been
+    # installed, neither of which happens until a detached job has finished.
+    if ($prefetch) {
+        Assert-TaskFailed -Message "Option 'prefetch' cannot be used with detach=yes"
+    }
+
+    if ($null -ne $pinned -or ($packages | Where-Object { $null -ne $_.pinned })) {
+        Assert-TaskFailed -Message "Option 'pinned' cannot be used with detach=yes, pin the packages once the job has finished"
+    }
+}
+
 if (-not $validate_certs) {
     [System.Net.ServicePointManager]::ServerCertificateValidationCallback = { $true }
 }
@@ -127,7 +219,28 @@ $installParams = @{
     SourcePassword = $source_password
 }
 
-if ($version -and "chocolatey" -in $name) {
+if ($null -ne $packages) {
+    # Resolve the options for each entry in the package list, falling back to the task level options for any
+    # that are not set on the entry itself.
+    $packages = @(
+        foreach ($entry in $packages) {
+            @{
+                name = $entry.name
+                pinned = if ($null -ne $entry.pinned) { $entry.pinned } else { $pinned }
+                source = if ($null -ne $entry.source) { $entry.source } else { $source }
+                state = if ($null -ne $entry.state) { $entry.state } else { $state }
+                version = if ($null -ne $entry.version) { $entry.version } else { $version }
+            }
+        }
+    )
+
+    $chocolateyEntry = $packages | Where-Object { $_.name -eq 'chocolatey' } | Select-Object -First 1
+    if ($chocolateyEntry.version) {
+        $installParams.Version = $chocolateyEntry.version
+        $installParams.SkipWarning = $true
+    }
+}
+elseif ($version -and "chocolatey" -in $name) {
     # If a version is set and chocolatey is in the package list, pass the chocolatey version to the bootstrapping
     # process.
     $installParams.Version = $version
@@ -138,16 +251,26 @@ if ($bootstrap_script) {
     $installParams.BootstrapScript = $bootstrap_script
 }
 
+if ($bootstrap_script_checksum) {
+    $installParams.BootstrapScriptChecksum = $bootstrap_script_checksum
+}
+
+if ($bootstrap_package) {
+    $installParams.BootstrapPackage = $bootstrap_package
+    $installParams.BootstrapPackageChecksum = $bootstrap_package_checksum
+}
+
+Start-ChocolateyPhase -Name 'bootstrap'
 $chocoCommand = Install-Chocolatey @installParams
+Stop-ChocolateyPhase -Name 'bootstrap'
 
-if ('all' -in $name -and $state -in @('present', 'reinstalled')) {
-    $message = "Cannot specify the package name as 'all' when state=$state"
-    Assert-TaskFailed -Message $message
+if ($spool_output) {
+    Enable-ChocolateyOutputSpool -ChocoCommand $chocoCommand -TailLength $output_tail
 }
 
-# Get the installed versions of all specified packages
-$packageInfo = $name | Get-ChocolateyPackageVersion -ChocoCommand $chocoCommand
+Start-ChocolateyPhase -Name 'version'
 $chocolateyVersion = Get-ChocolateyVersion -ChocoCommand $chocoCommand
+Stop-ChocolateyPhase -Name 'version'
 
 # Ensure module output contains the choco CLI version in case folks need it for
 # debugging purposes.
@@ -161,29 +284,352 @@ if ($chocolateyVersion -lt [version]'2.3.0' -and $ignore_pinned) {
     Assert-TaskFailed -Message "Option 'ignore_pinned' is not supported on the installed version of Chocolatey CLI"
 }
 
+$commonParams = @{
+    ChocoCommand = $chocoCommand
+    AllowDowngrade = ($state -eq "downgrade")
+    AllowEmptyChecksums = $allow_empty_checksums
+    AllowMultiple = $allow_multiple
+    AllowPrerelease = $allow_prerelease
+    Architecture = $architecture
+    Checksum = $checksum
+    Checksum64 = $checksum64
+    ChocoArgs = $choco_args
+    Detach = $detach
+    Force = $force
+    IgnoreChecksums = $ignore_checksums
+    IgnoreDependencies = $ignore_dependencies
+    InstallArgs = $install_args
+    OverrideArgs = $override_args
+    PackageParams = $package_params
+    ProxyUrl = $proxy_url
+    ProxyUsername = $proxy_username
+    ProxyPassword = $proxy_password
+    SkipScripts = $skip_scripts
+    Source = $source
+    SourceUsername = $source_username
+    SourcePassword = $source_password
+    Timeout = $timeout
+    Version = $version
+}
+
+if ($checksum_type -and $checksum_type -ne '') {
+    $commonParams.Add('ChecksumType', $checksum_type)
+}
+
+if ($checksum_type64 -and $checksum_type64 -ne '') {
+    $commonParams.Add('ChecksumType64', $checksum_type64)
+}
+
+$prefetchParams = @{
+    ChocoCommand = $chocoCommand
+    ProxyUrl = $proxy_url
+    ProxyUsername = $proxy_username
+    ProxyPassword = $proxy_password
+    SourceUsername = $source_username
+    SourcePassword = $source_password
+}
+
+$outdatedParams = @{
+    ChocoCommand = $chocoCommand
+    AllowPrerelease = $allow_prerelease
+    IgnorePinned = $ignore_pinned
+    SourceUsername = $source_username
+    SourcePassword = $source_password
+}
+
+if ($null -ne $packages) {
+    # Work out everything that needs to happen from a single read of the installed packages, and group the work
+    # so that packages sharing the same options are handled by a single choco.exe invocation.
+    foreach ($group in ($packages | Group-Object -Property { $_.name } | Where-Object Count -gt 1)) {
+        Assert-TaskFailed -Message "Package '$($group.Name)' is specified more than once in the packages list"
+    }
+
+    foreach ($entry in $packages) {
+        if ($entry.name -eq 'all' -and $entry.state -in @('downloaded', 'present', 'reinstalled')) {
+            $message = "Cannot specify the package name as 'all' when state=$($entry.state)"
+            Assert-TaskFailed -Message $message
+        }
+    }
+
+    Start-ChocolateyPhase -Name 'inventory'
+    $packageInfo = $packages.name | Get-ChocolateyPackageVersion -ChocoCommand $chocoCommand
+    Stop-ChocolateyPhase -Name 'inventory'
+
+    $downloadGroups = [ordered]@{}
+    $uninstallGroups = [ordered]@{}
+    $installGroups = [ordered]@{}
+    $upgradeGroups = [ordered]@{}
+
+    foreach ($entry in $packages) {
+        $installedVersions = @($packageInfo.($entry.name) | Where-Object { $_ })
+        $isInstalled = $installedVersions.Count -gt 0
+
+        # choco.exe matches versions in their normalized form, so e.g. 1.0 is the same version as an installed 1.0.0.
+        $isVersionInstalled = if ($entry.version) {
+            $normalizedVersions = @($installedVersions | ForEach-Object { ConvertTo-NormalizedVersion -Version $_ })
+            (ConvertTo-NormalizedVersion -Version $entry.version) -in $normalizedVersions
+        }
+
+        if ($entry.state -in @('absent', 'reinstalled') -and $isInstalled) {
+            # If a version has been supplied, only uninstall the package if that version is actually installed.
+            if (-not $entry.version -or $isVersionInstalled) {
+                # --allow-multiple is buggy for `choco uninstall`, it's only used when side by side versions are
+                # actually installed, see the equivalent comment for the single state below.
+                $useAllowMultiple = $installedVersions.Count -gt 1
+                $key = "$($entry.version)|$useAllowMultiple"
+                if (-not $uninstallGroups.Contains($key)) {
+                    $uninstallGroups[$key] = @{
+                        Version = $entry.version
+                        AllowMultiple = $useAllowMultiple
+                        Package = [System.Collections.Generic.List[string]]@()
+                    }
+                }
+
+                $uninstallGroups[$key].Package.Add($entry.name)
+            }
+
+            $isInstalled = $false
+        }
+
+        $operation = switch ($entry.state) {
+            'absent' { $null }
+            'downloaded' { 'download' }
+            'reinstalled' { 'install' }
+            'present' {
+                if (-not $isInstalled -or $force) {
+                    'install'
+                }
+                elseif ($entry.version -and -not $isVersionInstalled) {
+                    if (-not $allow_multiple) {
+                        $message = @(
+                            "Chocolatey package '$($entry.name)' is already installed with version(s) '$($installedVersions -join "', '")'"
+                            "but was expecting '$($entry.version)'. Either change the expected version, set state=latest or state=upgrade,"
+                            "set allow_multiple=yes, or set force=yes to continue"
+                        ) -join ' '
+                        Assert-TaskFailed -Message $message
+                    }
+
+                    'install'
+                }
+            }
+            'downgrade' {
+                if (-not $isInstalled) {
+                    'install'
+                }
+                elseif ($entry.version) {
+                    # Running choco upgrade without a version when state=downgrade would actually upgrade the package.
+                    'upgrade'
+                }
+            }
+            default {
+                if ($isInstalled) { 'upgrade' } else { 'install' }
+            }
+        }
+
+        if ($null -eq $operation) {
+            continue
+        }
+
+        $groups = switch ($operation) {
+            'download' { $downloadGroups }
+            'install' { $installGroups }
+            default { $upgradeGroups }
+        }
+        $allowDowngrade = $entry.state -eq 'downgrade'
+        $key = "$($entry.version)|$($entry.source)|$allowDowngrade"
+        if (-not $groups.Contains($key)) {
+            $groups[$key] = @{
+                Version = $entry.version
+                Source = $entry.source
+                AllowDowngrade = $allowDowngrade
+                Package = [System.Collections.Generic.List[string]]@()
+            }
+        }
+
+        $groups[$key].Package.Add($entry.name)
+    }
+
+    $module.Result.actions = [System.Collections.Generic.List[hashtable]]@()
+    if ($upgrade_outdated_only) {
+        $module.Result.outdated_packages = @()
+    }
+    $prefetched = [System.Collections.Generic.List[hashtable]]@()
+    $installedFiles = [System.Collections.Generic.List[hashtable]]@()
+
+    Start-ChocolateyPhase -Name 'download'
+    foreach ($group in $downloadGroups.Values) {
+        $saved = Save-ChocolateyPackage -Package $group.Package -Version $group.Version -Source $group.Source @prefetchParams
+        $prefetched.AddRange([hashtable[]]$saved.packages)
+        $module.Result.actions.Add(@{ action = 'download'; packages = $group.Package; version = $group.Version })
+
+        if ($saved.packages | Where-Object { $_.downloaded }) {
+            Set-TaskResultChanged
+        }
+    }
+    Stop-ChocolateyPhase -Name 'download'
+
+    Start-ChocolateyPhase -Name 'uninstall'
+    foreach ($group in $uninstallGroups.Values) {
+        $uninstallParams = @{
+            ChocoCommand = $chocoCommand
+            Package = $group.Package
+            Force = $force
+            PackageParams = $package_params
+            SkipScripts = $skip_scripts
+            RemoveDependencies = $remove_dependencies
+            Timeout = $timeout
+            Version = $group.Version
+            AllowMultiple = $group.AllowMultiple
+        }
+        Uninstall-ChocolateyPackage @uninstallParams
+        $module.Result.actions.Add(@{ action = 'uninstall'; packages = $group.Package; version = $group.Version })
+    }
+    Stop-ChocolateyPhase -Name 'uninstall'
+
+    Start-ChocolateyPhase -Name 'install'
+    foreach ($group in $installGroups.Values) {
+        $installGroupParams = $commonParams.Clone()
+        $installGroupParams.Version = $group.Version
+        $installGroupParams.Source = $group.Source
+        $installGroupParams.AllowDowngrade = $group.AllowDowngrade
+
+        if ($prefetch) {
+            $saved = Save-ChocolateyPackage -Package $group.Package -Version $group.Version -Source $group.Source @prefetchParams
+            $prefetched.AddRange([hashtable[]]$saved.packages)
+            $installedFiles.AddRange([hashtable[]]$saved.packages)
+            if (-not $module.CheckMode) {
+                $installGroupParams.Source = $saved.source
+            }
+        }
+
+        Install-ChocolateyPackage -Package $group.Package -Parallelism $parallelism @installGroupParams
+        $module.Result.actions.Add(@{ action = 'install'; packages = $group.Package; version = $group.Version })
+    }
+    Stop-ChocolateyPhase -Name 'install'
+
+    Start-ChocolateyPhase -Name 'upgrade'
+    foreach ($group in $upgradeGroups.Values) {
+        # Upgrading to a specific version, or forcing a reinstall, can apply to packages that aren't outdated.
+        if ($upgrade_outdated_only -and -not $group.Version -and -not $group.AllowDowngrade -and -not $force) {
+            $outdatedPackages = @(Select-ChocolateyOutdatedPackage -Package $group.Package -Source $group.Source @outdatedParams)
+            $module.Result.outdated_packages += $outdatedPackages
+
+            if ($outdatedPackages.Count -eq 0) {
+                continue
+            }
+
+            $group.Package = $outdatedPackages
+        }
+
+        $upgradeGroupParams = $commonParams.Clone()
+        $upgradeGroupParams.Version = $group.Version
+        $upgradeGroupParams.Source = $group.Source
+        $upgradeGroupParams.AllowDowngrade = $group.AllowDowngrade
+        $upgradeGroupParams.IgnorePinned = $ignore_pinned
+
+        if ($prefetch -and $group.Package -notcontains 'all') {
+            $saved = Save-ChocolateyPackage -Package $group.Package -Version $group.Version -Source $group.Source @prefetchParams
+            $prefetched.AddRange([hashtable[]]$saved.packages)
+            $installedFiles.AddRange([hashtable[]]$saved.packages)
+            if (-not $module.CheckMode) {
+                $upgradeGroupParams.Source = $saved.source
+            }
+        }
+
+        Update-ChocolateyPackage -Package $group.Package @upgradeGroupParams
+        $module.Result.actions.Add(@{ action = 'upgrade'; packages = $group.Package; version = $group.Version })
+    }
+    Stop-ChocolateyPhase -Name 'upgrade'
+
+    if ($detach) {
+        Start-ChocolateyJob -ChocoCommand $chocoCommand > $null
+    }
+
+    if ($prefetch -or $downloadGroups.Count -gt 0) {
+        $module.Result.prefetched = $prefetched
+    }
+
+    if (-not $module.CheckMode) {
+        # The packages downloaded for installs and upgrades have now been installed, so they no longer need to be kept.
+        foreach ($file in $installedFiles) {
+            Remove-Item -LiteralPath $file.path -Force -ErrorAction SilentlyContinue
+        }
+    }
+
+    $pinEntries = @($packages | Where-Object { $null -ne $_.pinned -and $_.state -notin @('absent', 'downloaded') })
+    if ($pinEntries.Count -gt 0) {
+        Start-ChocolateyPhase -Name 'pin'
+        Sync-ChocolateyPin -ChocoCommand $chocoCommand -Entry $pinEntries
+        Stop-ChocolateyPhase -Name 'pin'
+    }
+
+    if ($inventory_cache) {
+        Set-InventoryFact -ChocoCommand $chocoCommand
+    }
+
+    $module.ExitJson()
+}
+
+if ('all' -in $name -and $state -in @('downloaded', 'present', 'reinstalled')) {
+    $message = "Cannot specify the package name as 'all' when state=$state"
+    Assert-TaskFailed -Message $message
+}
+
+# Get the installed versions of all specified packages
+Start-ChocolateyPhase -Name 'inventory'
+$packageInfo = $name | Get-ChocolateyPackageVersion -ChocoCommand $chocoCommand
+Stop-ChocolateyPhase -Name 'inventory'
+
+if ($state -eq "downloaded") {
+    # Only download the packages, so they can be installed later with prefetch=yes without waiting on the network.
+    Start-ChocolateyPhase -Name 'download'
+    $prefetched = Save-ChocolateyPackage -Package $name -Version $version -Source $source @prefetchParams
+    Stop-ChocolateyPhase -Name 'download'
+    $module.Result.prefetched = $prefetched.packages
+
+    if ($prefetched.packages | Where-Object { $_.downloaded }) {
+        Set-TaskResultChanged
+    }
+}
+
 if ($state -in "absent", "reinstalled") {
     $installedPackages = $packageInfo.Keys | Where-Object { $null -ne $packageInfo.$_ }
 
     if ($null -ne $installedPackages) {
+        # --allow-multiple is buggy for `choco uninstall`.
+        # To get the correct behaviour, we have to use it only when multiple side by side package versions
+        # are actually installed, or we'll either just get errors, or end up uninstalling all installed versions
+        # even if a specific version is targeted. Packages are batched by whether they need it, so at most two
+        # choco.exe processes are run.
+        $uninstallGroups = @{
+            $false = [System.Collections.Generic.List[string]]@()
+            $true = [System.Collections.Generic.List[string]]@()
+        }
+        $targetVersion = if ($version) { ConvertTo-NormalizedVersion -Version $version }
+
         foreach ($package in $installedPackages) {
             # If a version has been supplied, check that that version of the package is actually installed.
             # If that version of the package is not present, don't uninstall other versions by accident.
             if ($version) {
-                $packageVersionedInfo = $package | Get-ChocolateyPackageVersion -ChocoCommand $chocoCommand -Version $version
-                $currentlyInstalledVersions = $packageVersionedInfo.Keys | Where-Object { $null -ne $packageVersionedInfo.$_ }
-                if (@($currentlyInstalledVersions).Count -eq 0) {
+                $installedVersions = @($packageInfo.$package | ForEach-Object { ConvertTo-NormalizedVersion -Version $_ })
+                if ($installedVersions -notcontains $targetVersion) {
                     continue
                 }
             }
 
-            # --allow-multiple is buggy for `choco uninstall`.
-            # To get the correct behaviour, we have to use it only when multiple side by side package versions
-            # are actually installed, or we'll either just get errors, or end up uninstalling all installed versions
-            # even if a specific version is targeted.
-            $useAllowMultiple = $packageInfo.$package.Count -gt 1
+            $useAllowMultiple = @($packageInfo.$package).Count -gt 1
+            $uninstallGroups[$useAllowMultiple].Add($package)
+        }
+
+        Start-ChocolateyPhase -Name 'uninstall'
+        foreach ($useAllowMultiple in $false, $true) {
+            if ($uninstallGroups[$useAllowMultiple].Count -eq 0) {
+                continue
+            }
+
             $uninstallParams = @{
                 ChocoCommand = $chocoCommand
-                Package = $package
+                Package = $uninstallGroups[$useAllowMultiple]
                 Force = $force
                 PackageParams = $package_params
                 SkipScripts = $skip_scripts
@@ -194,6 +640,7 @@ if ($state -in "absent", "reinstalled") {
             }
             Uninstall-ChocolateyPackage @uninstallParams
         }
+        Stop-ChocolateyPhase -Name 'uninstall'
     }
 
     # Ensure the package info for the uninstalled versions has been removed,
@@ -222,11 +669,15 @@ if ($state -in @("downgrade", "latest", "upgrade", "present", "reinstalled")) {
     # If version is specified and installed version does not match or not
     # allow_multiple, throw error. Ignore this if force is set.
     if ($state -eq "present" -and $null -ne $version -and -not $force) {
+        # Compare normalized versions, so 1.0 matches an installed 1.0.0.
+        $targetVersion = ConvertTo-NormalizedVersion -Version $version
+
         foreach ($package in $name) {
             $packageVersions = @($packageInfo.$package | Where-Object { $_ })
+            $normalizedVersions = @($packageVersions | ForEach-Object { ConvertTo-NormalizedVersion -Version $_ })
 
             if ($packageVersions.Count -gt 0) {
-                if (-not $packageVersions.Contains($version) -and -not $allow_multiple) {
+                if ($normalizedVersions -notcontains $targetVersion -and -not $allow_multiple) {
                     $message = @(
                         "Chocolatey package '$package' is already installed with version(s) '$($packageVersions -join "', '")'"
                         "but was expecting '$version'. Either change the expected version, set state=latest or state=upgrade,"
@@ -234,7 +685,7 @@ if ($state -in @("downgrade", "latest", "upgrade", "present", "reinstalled")) {
                     ) -join ' '
                     Assert-TaskFailed -Message $message
                 }
-                elseif ($version -notin $packageVersions -and $allow_multiple) {
+                elseif ($targetVersion -notin $normalizedVersions -and $allow_multiple) {
                     # add the package back into the list of missing packages if installing multiple
                     $missingPackages.Add($package)
                 }
@@ -242,52 +693,49 @@ if ($state -in @("downgrade", "latest", "upgrade", "present", "reinstalled")) {
         }
     }
 
-    $commonParams = @{
-        ChocoCommand = $chocoCommand
-        AllowDowngrade = ($state -eq "downgrade")
-        AllowEmptyChecksums = $allow_empty_checksums
-        AllowMultiple = $allow_multiple
-        AllowPrerelease = $allow_prerelease
-        Architecture = $architecture
-        Checksum = $checksum
-        Checksum64 = $checksum64
-        ChocoArgs = $choco_args
-        Force = $force
-        IgnoreChecksums = $ignore_checksums
-        IgnoreDependencies = $ignore_dependencies
-        InstallArgs = $install_args
-        OverrideArgs = $override_args
-        PackageParams = $package_params
-        ProxyUrl = $proxy_url
-        ProxyUsername = $proxy_username
-        ProxyPassword = $proxy_password
-        SkipScripts = $skip_scripts
-        Source = $source
-        SourceUsername = $source_username
-        SourcePassword = $source_password
-        Timeout = $timeout
-        Version = $version
-    }
+    $isUpgrade = $state -in @("latest", "upgrade") -or ($state -eq "downgrade" -and $null -ne $version)
 
-    if ($checksum_type -and $checksum_type -ne '') {
-        $commonParams.Add('ChecksumType', $checksum_type)
-    }
+    if ($prefetch -and 'all' -notin $name) {
+        # Upgrades need every named package, installs only the ones that are missing.
+        $prefetchPackages = if ($isUpgrade) { $name } else { $missingPackages }
+
+        if ($prefetchPackages.Count -gt 0) {
+            Start-ChocolateyPhase -Name 'download'
+            $prefetched = Save-ChocolateyPackage -Package $prefetchPackages -Version $version -Source $source @prefetchParams
+            Stop-ChocolateyPhase -Name 'download'
+            $module.Result.prefetched = $prefetched.packages
 
-    if ($checksum_type64 -and $checksum_type64 -ne '') {
-        $commonParams.Add('ChecksumType64', $checksum_type64)
+            if (-not $module.CheckMode) {
+                $commonParams.Source = $prefetched.source
+            }
+        }
     }
 
     if ($missingPackages.Count -gt 0) {
-        Install-ChocolateyPackage -Package $missingPackages @commonParams
+        Start-ChocolateyPhase -Name 'install'
+        Install-ChocolateyPackage -Package $missingPackages -Parallelism $parallelism @commonParams
+        Stop-ChocolateyPhase -Name 'install'
     }
 
-    if ($state -in @("latest", "upgrade") -or ($state -eq "downgrade" -and $null -ne $version)) {
+    if ($isUpgrade) {
+        Start-ChocolateyPhase -Name 'upgrade'
+
         # when in a downgrade/latest situation, we want to run choco upgrade on
         # the remaining packages that were already installed, don't run this if
         # state=downgrade and a version isn't specified (this will actually
         # upgrade a package)
         $installedPackages = ($packageInfo.GetEnumerator() | Where-Object { $null -ne $_.Value }).Key
 
+        if ($null -ne $installedPackages -and $upgrade_outdated_only -and -not $version -and -not $force) {
+            # Only run choco upgrade for the packages that have an update available, if there are any.
+            $installedPackages = @(Select-ChocolateyOutdatedPackage -Package $installedPackages -Source $source @outdatedParams)
+            $module.Result.outdated_packages = $installedPackages
+
+            if ($installedPackages.Count -eq 0) {
+                $installedPackages = $null
+            }
+        }
+
         if ($null -ne $installedPackages) {
             # --ignore-pinned only applied to choco upgrade and so this is being
             # added to the common parameters here to avoid an error if it passed
@@ -296,33 +744,31 @@ if ($state -in @("downgrade", "latest", "upgrade", "present", "reinstalled")) {
 
             Update-ChocolateyPackage -Package $installedPackages @commonParams
         }
+
+        Stop-ChocolateyPhase -Name 'upgrade'
     }
 
-    # Now we want to pin/unpin any packages now that it has been installed/upgraded
-    if ($null -ne $pinned) {
-        $pins = Get-ChocolateyPin -ChocoCommand $chocoCommand
+    if ($detach) {
+        Start-ChocolateyJob -ChocoCommand $chocoCommand > $null
+    }
 
-        foreach ($package in $name) {
-            if ($pins.ContainsKey($package)) {
-                if (-not $pinned -and $null -eq $version) {
-                    # No version is set and pinned=no, we want to remove all pins on the package. There is a bug in
-                    # 'choco pin remove' with multiple versions where an older version might be pinned but
-                    # 'choco pin remove' will still fail without an explicit version. Instead we take the literal
-                    # interpretation that pinned=no and no version means the package has no pins at all
-                    foreach ($v in $pins.$package) {
-                        Set-ChocolateyPin -ChocoCommand $chocoCommand -Name $package -Version $v
-                    }
-                }
-                elseif ($null -ne $version -and $pins.$package.Contains($version) -ne $pinned) {
-                    Set-ChocolateyPin -ChocoCommand $chocoCommand -Name $package -Pin:$pinned -Version $version
-                }
-            }
-            elseif ($pinned) {
-                # Package had no pins but pinned=yes is set.
-                Set-ChocolateyPin -ChocoCommand $chocoCommand -Name $package -Pin -Version $version
-            }
+    if ($prefetch -and $prefetched -and -not $module.CheckMode) {
+        # The downloaded packages have now been installed, so they no longer need to be kept.
+        foreach ($file in $prefetched.packages) {
+            Remove-Item -LiteralPath $file.path -Force -ErrorAction SilentlyContinue
         }
     }
+
+    # Now we want to pin/unpin any packages now that it has been installed/upgraded
+    if ($null -ne $pinned) {
+        Start-ChocolateyPhase -Name 'pin'
+        Sync-ChocolateyPin -ChocoCommand $chocoCommand -Name $name -Pinned $pinned -Version $version
+        Stop-ChocolateyPhase -Name 'pin'
+    }
+}
+
+if ($inventory_cache) {
+    Set-InventoryFact -ChocoCommand $chocoCommand
 }
 
 $module.ExitJson()
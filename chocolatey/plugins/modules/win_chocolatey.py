@@ -70,6 +70,27 @@ options:
     choices: [ default, x86 ]
     default: default
     version_added: '0.2.7'
+  bootstrap_package:
+    description:
+    - The path to a Chocolatey nupkg on the host, or on a share it can reach,
+      to install Chocolatey from if it is not already present on the system.
+    - Chocolatey is installed from this package without downloading the
+      bootstrap script or anything else, so hosts without access to the
+      internet or a repository can be bootstrapped from local disk.
+    - Copy the package to the host with M(ansible.windows.win_copy) first to
+      supply it from the controller.
+    - The version of Chocolatey installed is the version of this package,
+      any I(version) set for C(chocolatey) is not used to bootstrap it.
+    - Requires I(bootstrap_package_checksum) to be set.
+    type: path
+    version_added: '1.7.0'
+  bootstrap_package_checksum:
+    description:
+    - The SHA-256 checksum of I(bootstrap_package).
+    - The task fails without installing Chocolatey if the package does not
+      match this checksum.
+    type: str
+    version_added: '1.7.0'
   bootstrap_script:
     description:
     - Specify the bootstrap script URL that can be used to install Chocolatey
@@ -88,6 +109,13 @@ options:
     type: str
     version_added: '1.3.0'
     aliases: [ install_ps1, bootstrap_ps1 ]
+  bootstrap_script_checksum:
+    description:
+    - The SHA-256 checksum of the bootstrap script used to install Chocolatey.
+    - The task fails without running the script if it does not match this
+      checksum.
+    type: str
+    version_added: '1.7.0'
   bootstrap_tls_version:
     description:
     - Specify the TLS versions used when retrieving and invoking the I(bootstrap_script) to install
@@ -125,6 +153,26 @@ options:
     choices: [ md5, sha1, sha256, sha512 ]
     type: str
     version_added: '1.5.0'
+  detach:
+    description:
+    - Start the installs and upgrades as a job that runs on the host in the
+      background, and return as soon as it has started, rather than waiting for
+      Chocolatey to finish.
+    - Use M(chocolatey.chocolatey.win_chocolatey_job) with the returned
+      I(job_id) to check on the progress of each package and get the result.
+      The connection to the host isn't held open while the packages install,
+      so long installs aren't cut short by WinRM timeouts.
+    - The job runs the C(choco.exe) commands one after the other, so
+      I(parallelism) has no effect.
+    - I(timeout) still applies to each C(choco.exe) command run by the job, set
+      it to C(0) to let Chocolatey run for as long as it needs.
+    - Uninstalls are still run before the module returns.
+    - Cannot be used with I(pinned) or I(prefetch), as both act once the
+      packages are installed.
+    - Has no effect in check mode.
+    type: bool
+    default: false
+    version_added: '1.7.0'
   force:
     description:
     - Forces the install of a package, even if it already is installed.
@@ -168,13 +216,37 @@ options:
       for the Chocolatey package itself, use I(package_params).
     type: str
     version_added: '0.2.1'
+  inventory_cache:
+    description:
+    - Return the packages installed on the host as the C(ansible_chocolatey_inventory) fact.
+    - When this is set and the fact is already known for the host, a task that only
+      asks for packages to be present is checked against the fact on the controller.
+      If every package is already installed, and at the requested I(version) if set,
+      the task returns C(changed=false) without running the module on the host.
+    - The fact is refreshed every time the module runs. Packages that are removed
+      from the host outside of this module are not detected until then, so set
+      this only when this module is what manages the packages on the host.
+    - Configure a persistent fact cache plugin to keep the fact between playbook runs.
+    - Tasks that use I(force), I(pinned), I(allow_multiple), or I(ignore_pinned) always
+      run the module.
+    type: bool
+    default: false
+    version_added: '1.7.0'
   name:
     description:
     - Name of the package(s) to be installed.
     - Set to C(all) to run the action on all the installed packages.
+    - One of I(name) or I(packages) is required.
     type: list
     elements: str
-    required: true
+  output_tail:
+    description:
+    - The number of characters at the end of the output of C(choco.exe) to
+      return when I(spool_output) is set.
+    - The output is cut back further to start at the beginning of a line.
+    type: int
+    default: 4096
+    version_added: '1.7.0'
   override_args:
     description:
     - Override arguments of native installer with arguments provided by user.
@@ -194,6 +266,43 @@ options:
     type: str
     version_added: '0.2.1'
     aliases: [ params ]
+  packages:
+    description:
+    - A list of packages to manage in a single task, each with its own desired
+      state.
+    - The installed packages are read once, and packages that share the same
+      options are installed, upgraded, or uninstalled with a single call to
+      Chocolatey.
+    - Any of I(state), I(version), I(source), and I(pinned) that are not set on
+      an entry default to the task level value of that option.
+    - Mutually exclusive with I(name).
+    type: list
+    elements: dict
+    version_added: '1.7.0'
+    suboptions:
+      name:
+        description:
+        - Name of the package.
+        - Set to C(all) to run the action on all the installed packages.
+        type: str
+        required: true
+      pinned:
+        description:
+        - Whether to pin the package or not, see I(pinned) for details.
+        type: bool
+      source:
+        description:
+        - The source to retrieve the package from, see I(source) for details.
+        type: str
+      state:
+        description:
+        - State of the package on the system, see I(state) for details.
+        type: str
+        choices: [ absent, downgrade, downloaded, upgrade, latest, present, reinstalled ]
+      version:
+        description:
+        - Specific version of the package, see I(version) for details.
+        type: str
   choco_args:
     description:
     - Additional parameters to pass to choco.exe
@@ -209,6 +318,24 @@ options:
     elements: str
     version_added: '1.2.0'
     aliases: [ licensed_args ]
+  parallelism:
+    description:
+    - The maximum number of C(choco.exe install) processes to run at the same
+      time when several packages need to be installed.
+    - The packages are split into groups that don't install any of the same
+      dependencies, based on the package metadata on the source(s). Each group
+      is installed by a separate process.
+    - Local folder, NuGet v2, and NuGet v3 sources can be used to look up the
+      dependencies. If the dependencies of any package can't be found, all the
+      packages are installed by a single process, the same as when this is C(1).
+    - Only applies to installs. Upgrades and uninstalls are always run by a
+      single process.
+    - Only one Windows Installer (MSI) based install can run at a time. A group
+      that fails with exit code C(1618) because another install is in progress
+      is run again after the other groups have finished.
+    type: int
+    default: 1
+    version_added: '1.7.0'
   pinned:
     description:
     - Whether to pin the Chocolatey package or not.
@@ -218,8 +345,29 @@ options:
       and and no pin already exists.
     - Will unpin all versions of a package if C(no) and I(version) is not set.
     - This is ignored when C(state=absent).
+    - The current pins are read from the Chocolatey package information folder,
+      and the pins that need to change are written there directly. C(choco pin)
+      is only run when pinning a package without a version while more than one
+      version is installed.
     type: bool
     version_added: '0.2.8'
+  prefetch:
+    description:
+    - Download the packages to install or upgrade, and the dependencies they
+      would install, before running Chocolatey.
+    - Up to four packages are downloaded at the same time into the C(.ansible\prefetch)
+      folder in the Chocolatey install directory. Chocolatey then installs them
+      from that folder, with the original source(s) used for anything else.
+    - Files downloaded with I(state=downloaded) are reused. They are removed
+      once the package has been installed with this option set.
+    - Only packages on NuGet v2 and v3 sources are downloaded. Packages on
+      local folder sources are already available without the network.
+    - Installers that a package downloads from its install script are not
+      downloaded ahead of time. Installers embedded in the package are.
+    - Has no effect when I(name) is C(all).
+    type: bool
+    default: false
+    version_added: '1.7.0'
   proxy_url:
     description:
     - Proxy URL used to install chocolatey and the package.
@@ -286,6 +434,21 @@ options:
       credentials with a source with M(chocolatey.chocolatey.win_chocolatey_source) to avoid this.
     type: str
     version_added: '0.2.7'
+  spool_output:
+    description:
+    - Write the full output of C(choco.exe) to a log file on the host, and only
+      return the end of it, along with its size and the path to the file.
+    - Applies to I(stdout) when it is returned, and to I(stdout) and I(stderr)
+      when a command fails.
+    - The files are written to the C(logs\ansible) folder in the Chocolatey install
+      directory. The oldest are removed once there are more than 50 of them or
+      they add up to more than 100MB.
+    - Use M(chocolatey.chocolatey.win_chocolatey_log) to read the full output back
+      in slices.
+    - Output from installing Chocolatey itself is always returned in full.
+    type: bool
+    default: false
+    version_added: '1.7.0'
   state:
     description:
     - State of the package on the system.
@@ -296,8 +459,11 @@ options:
     - When C(latest) or C(upgrade), will ensure the package is installed to the latest
       available version.
     - When C(reinstalled), will uninstall and reinstall the package.
+    - When C(downloaded), will only download the package and the dependencies
+      it would install into the prefetch folder, see I(prefetch). The package
+      is not installed. C(downloaded) was added in version 1.7.0.
     type: str
-    choices: [ absent, downgrade, upgrade, latest, present, reinstalled ]
+    choices: [ absent, downgrade, downloaded, upgrade, latest, present, reinstalled ]
     default: present
   timeout:
     description:
@@ -306,6 +472,21 @@ options:
     default: 2700
     version_added: '0.2.3'
     aliases: [ execution_timeout ]
+  upgrade_outdated_only:
+    description:
+    - When I(state=latest) or I(state=upgrade), check which of the installed
+      packages have an update available, and only run C(choco upgrade) for those.
+    - Named packages are checked with a single C(choco upgrade --noop) query for
+      just those packages. I(name=all) is checked with a single
+      C(choco outdated) query.
+    - When none of the packages are outdated, C(choco upgrade) is not run at all.
+      This includes I(name=all).
+    - Pinned packages are only upgraded when I(ignore_pinned) is set.
+    - Has no effect when I(version) or I(force) is set, as those can apply to
+      packages that are not outdated.
+    type: bool
+    default: false
+    version_added: '1.7.0'
   validate_certs:
     description:
     - Used when downloading the Chocolatey install script if Chocolatey is not
@@ -339,6 +520,11 @@ notes:
 - When using verbosity 2 or less (C(-vv)) the C(stdout) output will be restricted.
   When using verbosity 4 (C(-vvvv)) the C(stdout) output will be more verbose.
   When using verbosity 5 (C(-vvvvv)) the C(stdout) output will include debug output.
+- Installs, upgrades, uninstalls, and pin changes wait for any other change
+  to Chocolatey on the host made by this collection, including detached jobs
+  and the other modules, so tasks running on a host at the same time never
+  run C(choco.exe) over each other. Checking which packages are installed or
+  outdated doesn't wait.
 - Some packages, like hotfixes or updates need an interactive user logon in
   order to install. You can use C(become) to achieve this, see
   :ref:`become_windows`.
@@ -359,6 +545,8 @@ seealso:
 - module: chocolatey.chocolatey.win_chocolatey_config
 - module: chocolatey.chocolatey.win_chocolatey_facts
 - module: chocolatey.chocolatey.win_chocolatey_feature
+- module: chocolatey.chocolatey.win_chocolatey_job
+- module: chocolatey.chocolatey.win_chocolatey_log
 - module: chocolatey.chocolatey.win_chocolatey_source
 - module: ansible.windows.win_feature
 - module: ansible.windows.win_hotfix
@@ -449,6 +637,23 @@ EXAMPLES = r'''
   environment:
     chocolateyDownloadUrl: "https://internal-web-server/files/chocolatey.1.1.0.nupkg"
 
+- name: Copy the Chocolatey package to freshly imaged hosts
+  ansible.windows.win_copy:
+    src: files/chocolatey.2.4.3.nupkg
+    dest: C:\Windows\Temp\chocolatey.2.4.3.nupkg
+
+- name: Ensure Chocolatey itself is installed from the local package, without network access
+  win_chocolatey:
+    name: chocolatey
+    bootstrap_package: C:\Windows\Temp\chocolatey.2.4.3.nupkg
+    bootstrap_package_checksum: '{{ chocolatey_nupkg_sha256 }}'
+
+- name: Ensure Chocolatey itself is installed, checking the downloaded bootstrap script
+  win_chocolatey:
+    name: chocolatey
+    bootstrap_script: https://internal-web-server/files/custom-chocolatey-install.ps1
+    bootstrap_script_checksum: '{{ chocolatey_install_script_sha256 }}'
+
 - name: Uninstall git
   win_chocolatey:
     name: git
@@ -512,6 +717,70 @@ EXAMPLES = r'''
     pinned: false
     state: present
 
+- name: Manage several packages with different states in a single task
+  win_chocolatey:
+    packages:
+    - name: git
+      state: latest
+    - name: notepadplusplus
+      version: 7.6.3
+      pinned: true
+    - name: putty
+      state: absent
+    - name: internal-tool
+      source: internal_repo
+
+- name: Install packages, skipping the task on hosts known to already have them
+  win_chocolatey:
+    name:
+    - git
+    - putty
+    inventory_cache: true
+
+- name: Install independent packages with up to 3 choco.exe processes at a time
+  win_chocolatey:
+    name:
+    - vscode
+    - git
+    - 7zip
+    parallelism: 3
+
+- name: Download packages ahead of a maintenance window
+  win_chocolatey:
+    name:
+    - vscode
+    - visualstudio2022buildtools
+    state: downloaded
+
+- name: Install the downloaded packages during the maintenance window
+  win_chocolatey:
+    name:
+    - vscode
+    - visualstudio2022buildtools
+    prefetch: true
+
+- name: Upgrade all packages, skipping choco upgrade when nothing is outdated
+  win_chocolatey:
+    name: all
+    state: latest
+    upgrade_outdated_only: true
+
+- name: Start installing Visual Studio without waiting for it to finish
+  win_chocolatey:
+    name: visualstudio2022enterprise
+    timeout: 0
+    detach: true
+  register: vs_install
+
+- name: Wait for Visual Studio to be installed
+  win_chocolatey_job:
+    id: '{{ vs_install.job_id }}'
+    wait: 30
+  register: vs_job
+  until: vs_job.finished
+  retries: 240
+  delay: 15
+
 - name: install a package with options that require licensed edition
   win_chocolatey:
     name: foo
@@ -521,6 +790,19 @@ EXAMPLES = r'''
     - --package-parameters-sensitive
     - '/Password=SecretPassword'
 
+- name: Upgrade all packages, keeping the full output on the host instead of returning it
+  win_chocolatey:
+    name: all
+    state: latest
+    spool_output: true
+    output_tail: 2048
+  register: upgrade_all
+
+- name: Read the first 64KB of the full output of the upgrade
+  win_chocolatey_log:
+    path: '{{ upgrade_all.stdout_log }}'
+  when: upgrade_all.stdout_log is defined
+
 - name: ensure .NET Framework 4.8 requirement is satisfied for Chocolatey CLI v2.0.0+
   block:
   - name: install Chocolatey CLI v1.4.0
@@ -544,11 +826,141 @@ EXAMPLES = r'''
 '''
 
 RETURN = r'''
+ansible_facts:
+  description: The facts returned when I(inventory_cache) is set.
+  returned: when I(inventory_cache) is set
+  type: complex
+  contains:
+    ansible_chocolatey_inventory:
+      description: The installed package IDs, each with the list of versions installed.
+      returned: always
+      type: dict
+      sample: { "chocolatey": [ "2.3.0" ], "git": [ "2.45.2" ] }
+cached:
+  description: Whether the result came from the C(ansible_chocolatey_inventory) fact without running the module.
+  returned: when I(inventory_cache) is set and the task is already satisfied
+  type: bool
+  sample: true
+choco_timings:
+  description:
+  - The time spent running each command, and in each phase of the task.
+  - The command lines themselves are not returned, as they may contain secrets.
+  returned: when the module runs, rather than being skipped with I(inventory_cache)
+  type: dict
+  version_added: '1.7.0'
+  contains:
+    commands:
+      description: Each command run by the task, in the order they finished.
+      type: list
+      elements: dict
+      contains:
+        label:
+          description: The kind of command that was run, such as C(list), C(outdated), C(install), or C(pin).
+          type: str
+          sample: install
+        seconds:
+          description: The wall time the command took, in seconds.
+          type: float
+          sample: 12.482
+        rc:
+          description: The return code of the command.
+          type: int
+          sample: 0
+        stdout_bytes:
+          description: The size of the stdout of the command, in bytes.
+          type: int
+          sample: 1834
+        stderr_bytes:
+          description: The size of the stderr of the command, in bytes.
+          type: int
+          sample: 0
+    phases:
+      description:
+      - The time spent in each phase of the task, in seconds.
+      - C(lock) is the time spent waiting for other changes to Chocolatey on
+        the host to finish.
+      type: dict
+      sample:
+        bootstrap: 0.012
+        version: 0.481
+        inventory: 1.207
+        install: 12.503
+        lock: 0.0
+        pin: 0.004
 command:
   description: The full command used in the chocolatey task.
   returned: changed
   type: str
   sample: choco.exe install -r --no-progress -y sysinternals --timeout 2700 --failonunfound
+actions:
+  description: The Chocolatey operations run when I(packages) is used, in the order they were run.
+  returned: when I(packages) is set
+  type: list
+  elements: dict
+  sample: [ { "action": "install", "packages": [ "git", "putty" ], "version": null } ]
+job_id:
+  description:
+  - The ID of the job started to install and upgrade the packages, to pass to
+    M(chocolatey.chocolatey.win_chocolatey_job).
+  returned: when I(detach) is set and packages need to be installed or upgraded
+  type: str
+  sample: 0f8fad5bd9cb469fa16570867728950e
+  version_added: '1.7.0'
+outdated_packages:
+  description: The packages with an update available, which C(choco upgrade) was run for.
+  returned: when I(upgrade_outdated_only) is set and installed packages were checked for updates
+  type: list
+  elements: str
+  sample: [ "git", "vscode" ]
+package_rc:
+  description:
+  - The exit code of the C(choco.exe install) run for each package.
+  - Set when I(parallelism) is greater than C(1) and the packages were installed
+    by more than one process.
+  returned: when packages were installed by more than one process
+  type: dict
+  sample: { "git": 0, "vscode": 3010 }
+pins_changed:
+  description: The pins that were added or removed by the task.
+  returned: when I(pinned) is set
+  type: list
+  elements: dict
+  contains:
+    name:
+      description: The package ID.
+      type: str
+      sample: notepadplusplus
+    version:
+      description: The pinned version, this is null when C(choco pin) pinned the installed version.
+      type: str
+      sample: 7.6.3
+    pinned:
+      description: Whether the pin was added or removed.
+      type: bool
+      sample: true
+  version_added: '1.7.0'
+prefetched:
+  description: The packages available in the prefetch folder for the task.
+  returned: when I(prefetch) is set or I(state=downloaded)
+  type: list
+  elements: dict
+  contains:
+    id:
+      description: The package ID.
+      type: str
+      sample: vscode
+    version:
+      description: The package version.
+      type: str
+      sample: 1.91.1
+    path:
+      description: The path to the downloaded nupkg file.
+      type: str
+      sample: C:\ProgramData\chocolatey\.ansible\prefetch\vscode.1.91.1.nupkg
+    downloaded:
+      description: Whether the file was downloaded by this task, rather than by an earlier one.
+      type: bool
+      sample: true
 rc:
   description: The return code from the chocolatey task.
   returned: always
@@ -561,4 +973,30 @@ stdout:
   returned: changed
   type: str
   sample: Chocolatey upgraded 1/1 packages.
+stdout_bytes:
+  description: The size of the full stdout from the chocolatey task, in bytes.
+  returned: I(spool_output) is set and I(stdout) is returned
+  type: int
+  sample: 48213
+  version_added: '1.7.0'
+stdout_log:
+  description:
+  - The path on the host to the full stdout from the chocolatey task.
+  - Read it with M(chocolatey.chocolatey.win_chocolatey_log).
+  returned: I(spool_output) is set and I(stdout) is returned
+  type: str
+  sample: C:\ProgramData\chocolatey\logs\ansible\20240701T091231482-upgrade-5f0c2a1e.stdout.log
+  version_added: '1.7.0'
+stderr_bytes:
+  description: The size of the full stderr of a failed chocolatey task, in bytes.
+  returned: I(spool_output) is set and the task failed with output on stderr
+  type: int
+  sample: 312
+  version_added: '1.7.0'
+stderr_log:
+  description: The path on the host to the full stderr of a failed chocolatey task.
+  returned: I(spool_output) is set and the task failed with output on stderr
+  type: str
+  sample: C:\ProgramData\chocolatey\logs\ansible\20240701T091231482-failed-9b41d7c0.stderr.log
+  version_added: '1.7.0'
 '''
@@ -27,15 +27,18 @@ $ErrorActionPreference = "Stop"
 function Get-ModuleSpec {
     @{
         options             = @{
-            name  = @{ type = "str"; required = $true }
-            state = @{ type = "str"; default = "present"; choices = "absent", "present" }
-            value = @{ type = "str" }
+            name     = @{ type = "str" }
+            settings = @{ type = "dict" }
+            state    = @{ type = "str"; default = "present"; choices = "absent", "present" }
+            value    = @{ type = "str" }
         }
-        required_if         = @(
-            # Explicit prefix `,` required, Ansible wants a list of lists for `required_if`
-            # Read as:
-            # ,@( [if] property, [is] value, [require] other_properties, $true_if_only_one_other_is_required ) -- last option is not mandatory
-            , @( 'state', 'present', @( 'value' ) )
+        mutually_exclusive  = @(
+            # Explicit `,` prefix required to prevent the array unrolling, Ansible requires nested arrays here.
+            , @( 'name', 'settings' )
+            , @( 'settings', 'value' )
+        )
+        required_one_of     = @(
+            , @( 'name', 'settings' )
         )
         supports_check_mode = $true
     }
@@ -47,6 +50,7 @@ $module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
 Set-ActiveModule $module
 
 $name = $module.Params.name
+$settings = $module.Params.settings
 $state = $module.Params.state
 $value = $module.Params.value
 
@@ -55,6 +59,33 @@ if ($module.DiffMode) {
     $module.Diff.after = $null
 }
 
+if ($null -ne $settings) {
+    # Read the config once and apply every setting that differs in a single write.
+    $chocoCommand = Get-ChocolateyCommand
+    $changes = @(Update-ChocolateyConfig -ChocoCommand $chocoCommand -Setting $settings)
+
+    $module.Result.changes = $changes
+    if ($changes.Count -gt 0) {
+        Set-TaskResultChanged
+    }
+
+    if ($module.DiffMode) {
+        $module.Diff.before = @{}
+        $module.Diff.after = @{}
+        foreach ($change in $changes) {
+            $module.Diff.before[$change.name] = $change.before
+            $module.Diff.after[$change.name] = $change.after
+        }
+    }
+
+    $module.ExitJson()
+}
+
+# The value is only required when managing a single setting, so this can't be a required_if in the module spec.
+if ($state -eq "present" -and $null -eq $value) {
+    Assert-TaskFailed -Message "state is present but all of the following are missing: value"
+}
+
 if ($state -eq "present") {
     if ([string]::IsNullOrEmpty($value)) {
         $message = "Cannot set Chocolatey config as an empty string when state=present, use state=absent instead"
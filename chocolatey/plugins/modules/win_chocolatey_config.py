@@ -24,8 +24,19 @@ options:
       valid configuration settings that can be changed.
     - Any config values that contain encrypted values like a password are not
       idempotent as the plaintext value cannot be read.
+    - Either this or I(settings) must be set.
     type: str
-    required: true
+  settings:
+    description:
+    - A dictionary of config setting names and the values to set them to, to
+      manage several settings at once.
+    - A setting with a null or empty value is unset, the same as C(state=absent).
+    - The config file is read once, and all the settings that differ are
+      written back in a single write of the file. Encrypted settings, like
+      C(proxyPassword), are still set with C(choco config).
+    - Cannot be used with I(name) or I(value), and I(state) is ignored.
+    type: dict
+    version_added: '1.7.0'
   state:
     description:
     - When C(absent), it will ensure the setting is unset or blank.
@@ -41,6 +52,9 @@ options:
     - Cannot be null or an empty string, use C(state=absent) to unset a config
       value instead.
     type: str
+notes:
+- Config changes wait for any other change to Chocolatey on the host made by
+  this collection to finish first. Reading the config doesn't wait.
 seealso:
 - module: chocolatey.chocolatey.win_chocolatey
 - module: chocolatey.chocolatey.win_chocolatey_facts
@@ -63,7 +77,63 @@ EXAMPLES = r'''
   win_chocolatey_config:
     name: cacheLocation
     state: absent
+
+- name: Set several config values at once, unsetting the proxy
+  win_chocolatey_config:
+    settings:
+      cacheLocation: D:\chocolatey_temp
+      commandExecutionTimeoutSeconds: 14400
+      proxy: ''
 '''
 
 RETURN = r'''
+changes:
+  description:
+  - The config settings that differed from I(settings), with the value before
+    and after the task.
+  - The values of encrypted settings are not returned.
+  returned: when I(settings) is set
+  type: list
+  elements: dict
+  sample: [ { "name": "cacheLocation", "before": "", "after": "D:\\chocolatey_temp" } ]
+  version_added: '1.7.0'
+choco_timings:
+  description:
+  - The time spent running each command, and in each phase of the task.
+  - The command lines themselves are not returned, as they may contain secrets.
+  returned: always
+  type: dict
+  version_added: '1.7.0'
+  contains:
+    commands:
+      description: Each command run by the task, in the order they finished.
+      type: list
+      elements: dict
+      contains:
+        label:
+          description: The kind of command that was run, such as C(list), C(outdated), C(install), or C(pin).
+          type: str
+          sample: install
+        seconds:
+          description: The wall time the command took, in seconds.
+          type: float
+          sample: 12.482
+        rc:
+          description: The return code of the command.
+          type: int
+          sample: 0
+        stdout_bytes:
+          description: The size of the stdout of the command, in bytes.
+          type: int
+          sample: 1834
+        stderr_bytes:
+          description: The size of the stderr of the command, in bytes.
+          type: int
+          sample: 0
+    phases:
+      description:
+      - The time spent in each phase of the task, in seconds.
+      - Only C(lock) is recorded by this module, the time spent waiting for
+        other changes to Chocolatey on the host to finish.
+      type: dict
 '''
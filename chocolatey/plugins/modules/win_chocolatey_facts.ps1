@@ -40,6 +40,10 @@ function Get-ModuleSpec {
                 default = "all"
                 aliases = "gather_subset"
             }
+            outdated_cache_ttl = @{
+                type = "int"
+                default = 0
+            }
         }
         supports_check_mode = $true
     }
@@ -51,6 +55,7 @@ $module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
 Set-ActiveModule $module
 
 $gather_filter = $module.Params.filter
+$outdated_cache_ttl = $module.Params.outdated_cache_ttl
 
 $chocoCommand = Get-ChocolateyCommand
 
@@ -58,30 +63,78 @@ $module.Result.ansible_facts = @{
     ansible_chocolatey = @{}
 }
 
-if ($gather_filter -contains "all" -or $gather_filter -contains "config") {
+$gatherSubset = @{}
+foreach ($subset in "config", "feature", "outdated", "packages", "sources") {
+    $gatherSubset[$subset] = $gather_filter -contains "all" -or $gather_filter -contains $subset
+}
+
+# The time spent gathering each subset is recorded as a phase of the same name in choco_timings.
+
+# choco outdated has to query every source, so it is started first and left to run while the rest is gathered.
+# With a cache TTL, the persisted result is checked once the rest has been gathered instead.
+$outdatedProcess = $null
+if ($gatherSubset.outdated) {
+    # This includes the time spent running in the background while the other subsets are gathered.
+    Start-ChocolateyPhase -Name 'outdated'
+    if ($outdated_cache_ttl -le 0) {
+        $outdatedProcess = Start-ChocolateyOutdated -ChocoCommand $chocoCommand
+    }
+}
+
+# The config, feature, and sources subsets are all read from a single parse of chocolatey.config.
+$configXml = $null
+if ($gatherSubset.config -or $gatherSubset.feature -or $gatherSubset.sources) {
+    Start-ChocolateyPhase -Name 'config_file'
+    $configXml = Get-ChocolateyConfigXml -ChocoCommand $chocoCommand
+    Stop-ChocolateyPhase -Name 'config_file'
+}
+
+if ($gatherSubset.config) {
+    Start-ChocolateyPhase -Name 'config'
     $module.Result.ansible_facts.ansible_chocolatey.Add(
-        "config", (Get-ChocolateyConfig -ChocoCommand $chocoCommand)
+        "config", (Get-ChocolateyConfig -ChocoCommand $chocoCommand -ConfigXml $configXml)
     )
+    Stop-ChocolateyPhase -Name 'config'
 }
-if ($gather_filter -contains "all" -or $gather_filter -contains "feature") {
+if ($gatherSubset.feature) {
+    Start-ChocolateyPhase -Name 'feature'
     $module.Result.ansible_facts.ansible_chocolatey.Add(
-        "feature", (Get-ChocolateyFeature -ChocoCommand $chocoCommand)
+        "feature", (Get-ChocolateyFeature -ChocoCommand $chocoCommand -ConfigXml $configXml)
     )
+    Stop-ChocolateyPhase -Name 'feature'
 }
-if ($gather_filter -contains "all" -or $gather_filter -contains "sources") {
+if ($gatherSubset.sources) {
+    Start-ChocolateyPhase -Name 'sources'
     $module.Result.ansible_facts.ansible_chocolatey.Add(
-        "sources", @(Get-ChocolateySource -ChocoCommand $chocoCommand)
+        "sources", @(Get-ChocolateySource -ChocoCommand $chocoCommand -ConfigXml $configXml)
     )
+    Stop-ChocolateyPhase -Name 'sources'
 }
-if ($gather_filter -contains "all" -or $gather_filter -contains "packages") {
+if ($gatherSubset.packages) {
+    Start-ChocolateyPhase -Name 'packages'
     $module.Result.ansible_facts.ansible_chocolatey.Add(
         "packages", @(Get-ChocolateyPackage -ChocoCommand $chocoCommand)
     )
+    Stop-ChocolateyPhase -Name 'packages'
 }
-if ($gather_filter -contains "all" -or $gather_filter -contains "outdated") {
+if ($gatherSubset.outdated) {
+    $outdatedParams = @{
+        ChocoCommand = $chocoCommand
+    }
+    if ($outdated_cache_ttl -gt 0) {
+        $outdatedParams.MaximumAge = $outdated_cache_ttl
+        if ($configXml) {
+            $outdatedParams.ConfigXml = $configXml
+        }
+    }
+    else {
+        $outdatedParams.NativeProcess = $outdatedProcess
+    }
+
     $module.Result.ansible_facts.ansible_chocolatey.Add(
-        "outdated", @(Get-ChocolateyOutdated -ChocoCommand $chocoCommand)
+        "outdated", @(Get-ChocolateyOutdated @outdatedParams)
     )
+    Stop-ChocolateyPhase -Name 'outdated'
 }
 
 $module.Result.ansible_facts.ansible_chocolatey.Add(
@@ -31,8 +31,25 @@ options:
     choices: [ all, config, feature, outdated, packages, sources ]
     default: "all"
     aliases: [ gather_subset ]
+  outdated_cache_ttl:
+    description:
+    - The number of seconds a persisted C(outdated) result can be reused for.
+    - The result is persisted on the host along with the installed package
+      versions and the enabled sources it was computed against. Within the TTL,
+      only packages installed, upgraded, or uninstalled since are checked
+      against the sources again, and the whole result is refreshed if the
+      enabled sources change.
+    - Pinning or unpinning a package is not tracked, so the C(pinned) value of
+      a reused result may be out of date until the TTL expires.
+    - Set to C(0) to check every package on each run.
+    type: int
+    default: 0
+    version_added: '1.7.0'
 notes:
 - Chocolatey must be installed beforehand, use M(chocolatey.chocolatey.win_chocolatey) to do this.
+- The C(config), C(feature), and C(sources) subsets are all read from a single
+  parse of the Chocolatey config file. The C(outdated) subset is checked in the
+  background while the other subsets are gathered.
 seealso:
 - module: chocolatey.chocolatey.win_chocolatey
 - module: chocolatey.chocolatey.win_chocolatey_config
@@ -93,9 +110,69 @@ EXAMPLES = r'''
 - name: Displays the collected config and feature facts from chocolatey
   debug:
     var: ansible_chocolatey
+
+- name: Gather outdated packages, reusing the result from the last hour
+  win_chocolatey_facts:
+    filter:
+    - 'outdated'
+    outdated_cache_ttl: 3600
 '''
 
 RETURN = r'''
+choco_timings:
+  description:
+  - The time spent running each command, and in each phase of the task.
+  - The command lines themselves are not returned, as they may contain secrets.
+  returned: always
+  type: dict
+  version_added: '1.7.0'
+  contains:
+    commands:
+      description: Each command run by the task, in the order they finished.
+      type: list
+      elements: dict
+      contains:
+        label:
+          description: The kind of command that was run, such as C(list), C(outdated), C(install), or C(pin).
+          type: str
+          sample: install
+        seconds:
+          description: The wall time the command took, in seconds.
+          type: float
+          sample: 12.482
+        rc:
+          description: The return code of the command.
+          type: int
+          sample: 0
+        stdout_bytes:
+          description: The size of the stdout of the command, in bytes.
+          type: int
+          sample: 1834
+        stderr_bytes:
+          description: The size of the stderr of the command, in bytes.
+          type: int
+          sample: 0
+    phases:
+      description:
+      - The time spent gathering each subset, in seconds, keyed by the name of
+        the subset.
+      - C(config_file) is the time taken to read the Chocolatey config file
+        shared by the C(config), C(feature), and C(sources) subsets.
+      - C(outdated) includes the time it spent running in the background.
+      type: dict
+      sample:
+        config_file: 0.004
+        config: 0.001
+        outdated: 6.218
+outdated_cache:
+  description:
+  - Whether the persisted C(outdated) result was used.
+  - C(hit) when it was reused as is, C(partial) when only changed packages
+    were checked again, and C(miss) when every package was checked.
+  returned: when I(outdated_cache_ttl) is set and outdated packages are gathered
+  type: str
+  version_added: '1.7.0'
+  sample: hit
 ansible_facts:
   description: Detailed information about the Chocolatey installation
   returned: always
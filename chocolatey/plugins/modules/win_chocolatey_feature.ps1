@@ -27,9 +27,17 @@ $ErrorActionPreference = "Stop"
 function Get-ModuleSpec {
     @{
         options             = @{
-            name  = @{ type = "str"; required = $true }
-            state = @{ type = "str"; default = "enabled"; choices = "disabled", "enabled" }
+            features = @{ type = "dict" }
+            name     = @{ type = "str" }
+            state    = @{ type = "str"; default = "enabled"; choices = "disabled", "enabled" }
         }
+        mutually_exclusive  = @(
+            # Explicit `,` prefix required to prevent the array unrolling, Ansible requires nested arrays here.
+            , @( 'features', 'name' )
+        )
+        required_one_of     = @(
+            , @( 'features', 'name' )
+        )
         supports_check_mode = $true
     }
 }
@@ -39,10 +47,45 @@ $spec = Get-ModuleSpec
 $module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
 Set-ActiveModule $module
 
+$features = $module.Params.features
 $name = $module.Params.name
 $state = $module.Params.state
 
 $chocoCommand = Get-ChocolateyCommand
+
+if ($null -ne $features) {
+    # Each feature can be given as a boolean, or as the same enabled/disabled values used by state.
+    $desiredStates = @{}
+    foreach ($feature in $features.GetEnumerator()) {
+        $desiredStates[$feature.Key] = switch -Regex ("$($feature.Value)") {
+            '^(enabled|true|yes|on|1)$' { $true }
+            '^(disabled|false|no|off|0)$' { $false }
+            default {
+                $message = "Invalid state '$($feature.Value)' for feature '$($feature.Key)', expected enabled or disabled"
+                Assert-TaskFailed -Message $message
+            }
+        }
+    }
+
+    # Read the feature states once and apply every feature that differs in a single write.
+    $changes = @(Update-ChocolateyFeature -ChocoCommand $chocoCommand -Feature $desiredStates)
+
+    $module.Result.changes = $changes
+    if ($changes.Count -gt 0) {
+        Set-TaskResultChanged
+    }
+
+    if ($module.DiffMode) {
+        $module.Diff.before = @{}
+        $module.Diff.after = @{}
+        foreach ($change in $changes) {
+            $module.Diff.before[$change.name] = if ($change.before) { 'enabled' } else { 'disabled' }
+            $module.Diff.after[$change.name] = if ($change.after) { 'enabled' } else { 'disabled' }
+        }
+    }
+
+    $module.ExitJson()
+}
 $featureStates = Get-ChocolateyFeature -ChocoCommand $chocoCommand
 
 if ($name -notin $featureStates.Keys) {
@@ -23,8 +23,18 @@ options:
     - Run C(choco.exe feature list) to get a list of features that can be
       managed.
     - For a list of options see L(Chocolatey feature docs,https://chocolatey.org/docs/chocolatey-configuration#features)
+    - Either this or I(features) must be set.
     type: str
-    required: true
+  features:
+    description:
+    - A dictionary of feature names and whether they should be enabled, to
+      manage several features at once.
+    - Each value can be C(enabled) or C(disabled), or a boolean.
+    - The feature states are read once, and all the features that differ are
+      written back in a single write of the Chocolatey config file.
+    - Cannot be used with I(name), and I(state) is ignored.
+    type: dict
+    version_added: '1.7.0'
   state:
     description:
     - When C(disabled) then the feature will be disabled.
@@ -32,6 +42,9 @@ options:
     type: str
     choices: [ disabled, enabled ]
     default: enabled
+notes:
+- Features are only changed once no other task is changing Chocolatey on the
+  host.
 seealso:
 - module: chocolatey.chocolatey.win_chocolatey
 - module: chocolatey.chocolatey.win_chocolatey_config
@@ -53,7 +66,60 @@ EXAMPLES = r'''
   win_chocolatey_feature:
     name: stopOnFirstPackageFailure
     state: enabled
+
+- name: Apply a baseline of feature states at once
+  win_chocolatey_feature:
+    features:
+      checksumFiles: enabled
+      allowGlobalConfirmation: true
+      showDownloadProgress: disabled
 '''
 
 RETURN = r'''
+changes:
+  description: The features that differed from I(features), with the state before and after the task.
+  returned: when I(features) is set
+  type: list
+  elements: dict
+  sample: [ { "name": "showDownloadProgress", "before": true, "after": false } ]
+  version_added: '1.7.0'
+choco_timings:
+  description:
+  - The time spent running each command, and in each phase of the task.
+  - The command lines themselves are not returned, as they may contain secrets.
+  returned: always
+  type: dict
+  version_added: '1.7.0'
+  contains:
+    commands:
+      description: Each command run by the task, in the order they finished.
+      type: list
+      elements: dict
+      contains:
+        label:
+          description: The kind of command that was run, such as C(list), C(outdated), C(install), or C(pin).
+          type: str
+          sample: install
+        seconds:
+          description: The wall time the command took, in seconds.
+          type: float
+          sample: 12.482
+        rc:
+          description: The return code of the command.
+          type: int
+          sample: 0
+        stdout_bytes:
+          description: The size of the stdout of the command, in bytes.
+          type: int
+          sample: 1834
+        stderr_bytes:
+          description: The size of the stderr of the command, in bytes.
+          type: int
+          sample: 0
+    phases:
+      description:
+      - The time spent in each phase of the task, in seconds.
+      - Only C(lock) is recorded by this module, the time spent waiting for
+        other changes to Chocolatey on the host to finish.
+      type: dict
 '''
@@ -0,0 +1,102 @@
+#!powershell
+
+# Copyright: (c) 2020, Chocolatey Software
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+#Requires -Module Ansible.ModuleUtils.ArgvParser
+#Requires -Module Ansible.ModuleUtils.CommandUtil
+
+#AnsibleRequires -CSharpUtil Ansible.Basic
+
+#AnsibleRequires -PowerShell ansible_collections.chocolatey.chocolatey.plugins.module_utils.Common
+#AnsibleRequires -PowerShell ansible_collections.chocolatey.chocolatey.plugins.module_utils.Jobs
+
+[Diagnostics.CodeAnalysis.SuppressMessageAttribute(
+    'PSUseConsistentWhitespace',
+    '',
+    Justification = 'Relax whitespace rule for better readability in module spec',
+    Scope = 'function',
+    # Apply suppression specifically to module spec
+    Target = 'Get-ModuleSpec')]
+param()
+
+$ErrorActionPreference = "Stop"
+
+# Documentation: https://docs.ansible.com/ansible/2.10/dev_guide/developing_modules_general_windows.html#windows-new-module-development
+function Get-ModuleSpec {
+    @{
+        options             = @{
+            cleanup = @{ type = "bool"; default = $false }
+            id      = @{ type = "str"; required = $true; aliases = "job_id" }
+            wait    = @{ type = "int"; default = 0 }
+        }
+        supports_check_mode = $true
+    }
+}
+
+$spec = Get-ModuleSpec
+
+$module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
+Set-ActiveModule $module
+
+$cleanup = $module.Params.cleanup
+$id = $module.Params.id
+$wait = $module.Params.wait
+
+# Only the status file of the job is read, no choco.exe commands are run.
+$module.Result.Remove('choco_timings') > $null
+
+$chocoCommand = Get-ChocolateyCommand
+
+if ($id -notmatch '^[0-9a-f]{32}$') {
+    Assert-TaskFailed -Message "Invalid job id '$id', expected the job_id returned by win_chocolatey"
+}
+
+$deadline = [DateTime]::UtcNow.AddSeconds($wait)
+$job = Get-ChocolateyJob -ChocoCommand $chocoCommand -Id $id
+
+# Waiting on the host saves a round trip per check, while still returning before WinRM timeouts are reached.
+while ($null -ne $job -and $job.state -in 'pending', 'waiting', 'running' -and [DateTime]::UtcNow -lt $deadline) {
+    Start-Sleep -Seconds 1
+    $job = Get-ChocolateyJob -ChocoCommand $chocoCommand -Id $id
+}
+
+if ($null -eq $job) {
+    Assert-TaskFailed -Message "No Chocolatey job with the id '$id' was found on the host"
+}
+
+$finished = $job.state -in 'finished', 'lost'
+$started = [DateTime]::Parse($job.started, $null, [System.Globalization.DateTimeStyles]::RoundtripKind)
+$ended = if ($job.finished) {
+    [DateTime]::Parse($job.finished, $null, [System.Globalization.DateTimeStyles]::RoundtripKind)
+}
+else {
+    [DateTime]::UtcNow
+}
+
+$module.Result.job_id = $id
+$module.Result.state = $job.state
+$module.Result.finished = $finished
+$module.Result.rc = $job.rc
+$module.Result.started = $job.started
+$module.Result.ended = $job.finished
+$module.Result.elapsed = [Math]::Round(($ended - $started).TotalSeconds, 3)
+$module.Result.steps = $job.steps
+$module.Result.packages = $job.packages
+$module.Result.output_path = $job.output_path
+
+if ($finished -and $cleanup) {
+    if (-not $module.CheckMode) {
+        Remove-ChocolateyJob -ChocoCommand $chocoCommand -Id $id
+    }
+
+    $module.Result.output_path = $null
+    Set-TaskResultChanged
+}
+
+if ($finished -and $job.failed) {
+    $message = if ($job.msg) { $job.msg } else { "The Chocolatey job '$id' failed" }
+    Assert-TaskFailed -Message $message
+}
+
+$module.ExitJson()
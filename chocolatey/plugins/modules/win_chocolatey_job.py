@@ -0,0 +1,193 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2020, Chocolatey Software
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = r'''
+---
+module: win_chocolatey_job
+version_added: '1.7.0'
+short_description: Checks on a Chocolatey job started in the background
+description:
+- Returns the progress and result of a job started by
+  M(chocolatey.chocolatey.win_chocolatey) with I(detach) set.
+- The job records its progress in a status file on the host as it goes, so
+  checking on it only reads that file. No C(choco.exe) commands are run.
+- Fails once the job has finished if any of its commands failed, or if the job
+  was stopped before it could record a result, such as by a reboot.
+options:
+  id:
+    description:
+    - The I(job_id) returned by M(chocolatey.chocolatey.win_chocolatey).
+    type: str
+    required: true
+    aliases: [ job_id ]
+  wait:
+    description:
+    - The number of seconds to wait on the host for the job to finish before
+      returning.
+    - Keep this below the WinRM operation timeout, and use C(until) to keep
+      checking on longer jobs.
+    - When C(0), the current progress is returned straight away.
+    type: int
+    default: 0
+  cleanup:
+    description:
+    - Remove the status and output of the job from the host once it has
+      finished.
+    - Jobs that are still running are never removed.
+    type: bool
+    default: false
+notes:
+- The jobs are kept in the C(.ansible\jobs) folder in the Chocolatey install
+  directory, which only the system, administrators, and the user that started
+  the job can access.
+seealso:
+- module: chocolatey.chocolatey.win_chocolatey
+author:
+- Chocolatey Software (@chocolatey)
+'''
+
+EXAMPLES = r'''
+- name: Start upgrading all packages in the background
+  win_chocolatey:
+    name: all
+    state: latest
+    detach: true
+  register: upgrade
+
+- name: Wait for the upgrade to finish, checking every 30 seconds for up to 2 hours
+  win_chocolatey_job:
+    id: '{{ upgrade.job_id }}'
+    wait: 25
+    cleanup: true
+  register: upgrade_job
+  until: upgrade_job.finished
+  retries: 240
+  delay: 5
+  when: upgrade.job_id is defined
+
+- name: Report the packages still being installed
+  win_chocolatey_job:
+    id: '{{ upgrade.job_id }}'
+  register: upgrade_job
+
+- debug:
+    msg: "{{ upgrade_job.packages | selectattr('state', 'equalto', 'running') | map(attribute='name') | list }}"
+'''
+
+RETURN = r'''
+job_id:
+  description: The ID of the job.
+  returned: always
+  type: str
+  sample: 0f8fad5bd9cb469fa16570867728950e
+state:
+  description:
+  - The state of the job.
+  - C(pending) until the background process has started, C(waiting) while it
+    waits for any other change to the Chocolatey installation on the host to
+    finish, C(running) while it runs the commands, and C(finished) once they
+    have all run or one of them has failed.
+  - C(lost) when the job was stopped before it could record a result.
+  returned: always
+  type: str
+  sample: running
+finished:
+  description: Whether the job has finished, so there is no need to check on it again.
+  returned: always
+  type: bool
+  sample: false
+rc:
+  description:
+  - The return code of the last C(choco.exe) command run by the job.
+  - Null until the first command has finished.
+  returned: always
+  type: int
+  sample: 0
+started:
+  description: When the job was started, in UTC.
+  returned: always
+  type: str
+  sample: '2024-07-01T09:12:31.4821137Z'
+ended:
+  description: When the job finished, in UTC, or null if it hasn't.
+  returned: always
+  type: str
+  sample: '2024-07-01T10:47:02.1190432Z'
+elapsed:
+  description: The number of seconds the job has been running for, or ran for if it has finished.
+  returned: always
+  type: float
+  sample: 5670.637
+steps:
+  description: The C(choco.exe) commands run by the job, in order.
+  returned: always
+  type: list
+  elements: dict
+  contains:
+    index:
+      description: The position of the command in the job, starting at 0.
+      type: int
+      sample: 0
+    label:
+      description: The kind of command, C(install) or C(upgrade).
+      type: str
+      sample: install
+    packages:
+      description: The packages the command installs or upgrades.
+      type: list
+      elements: str
+      sample: [ "visualstudio2022enterprise" ]
+    state:
+      description:
+      - The state of the command, one of C(pending), C(running), C(finished),
+        or C(skipped).
+      - Commands after one that failed are skipped.
+      type: str
+      sample: finished
+    rc:
+      description: The return code of the command, or null if it hasn't finished.
+      type: int
+      sample: 3010
+    started:
+      description: When the command was started, in UTC.
+      type: str
+      sample: '2024-07-01T09:12:32.0316802Z'
+    finished:
+      description: When the command finished, in UTC.
+      type: str
+      sample: '2024-07-01T10:47:01.9864015Z'
+packages:
+  description: The progress of each package in the job.
+  returned: always
+  type: list
+  elements: dict
+  contains:
+    name:
+      description: The package ID.
+      type: str
+      sample: visualstudio2022enterprise
+    step:
+      description: The index of the command that installs or upgrades the package.
+      type: int
+      sample: 0
+    state:
+      description: One of C(pending), C(running), C(succeeded), C(failed), or C(skipped).
+      type: str
+      sample: succeeded
+    version:
+      description: The version being installed, once Chocolatey has reported it.
+      type: str
+      sample: 117.10.2.0
+output_path:
+  description: The path on the host to the output of the C(choco.exe) commands run by the job.
+  returned: always, null once the job has been cleaned up
+  type: str
+  sample: C:\ProgramData\chocolatey\.ansible\jobs\0f8fad5bd9cb469fa16570867728950e\output.log
+'''
@@ -0,0 +1,167 @@
+#!powershell
+
+# Copyright: (c) 2020, Chocolatey Software
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+#Requires -Module Ansible.ModuleUtils.ArgvParser
+#Requires -Module Ansible.ModuleUtils.CommandUtil
+
+#AnsibleRequires -CSharpUtil Ansible.Basic
+
+#AnsibleRequires -PowerShell ansible_collections.chocolatey.chocolatey.plugins.module_utils.Common
+
+[Diagnostics.CodeAnalysis.SuppressMessageAttribute(
+    'PSUseConsistentWhitespace',
+    '',
+    Justification = 'Relax whitespace rule for better readability in module spec',
+    Scope = 'function',
+    # Apply suppression specifically to module spec
+    Target = 'Get-ModuleSpec')]
+param()
+
+$ErrorActionPreference = "Stop"
+
+# The most that can be read in one task, so a single result stays small enough to send back over WinRM.
+$maxLength = 1MB
+
+# Documentation: https://docs.ansible.com/ansible/2.10/dev_guide/developing_modules_general_windows.html#windows-new-module-development
+function Get-ModuleSpec {
+    @{
+        options             = @{
+            length = @{ type = "int"; default = 65536 }
+            offset = @{ type = "int"; default = 0 }
+            path   = @{ type = "str"; required = $true }
+        }
+        supports_check_mode = $true
+    }
+}
+
+function Get-Utf8Boundary {
+    <#
+        .SYNOPSIS
+        Gets the index in a UTF-8 buffer that the bytes before it end with a whole character at.
+    #>
+    [CmdletBinding()]
+    param(
+        # The UTF-8 bytes.
+        [Parameter(Mandatory = $true)]
+        [byte[]]
+        $Buffer,
+
+        # The number of bytes in the buffer that were read.
+        [Parameter(Mandatory = $true)]
+        [int]
+        $Count
+    )
+
+    # Continuation bytes are 10xxxxxx and follow the first byte of a character, which is never more than 4 long.
+    $lead = $Count - 1
+    while ($lead -gt 0 -and $lead -gt $Count - 4 -and ($Buffer[$lead] -band 0xC0) -eq 0x80) {
+        $lead--
+    }
+
+    $charLength = if (($Buffer[$lead] -band 0x80) -eq 0) {
+        1
+    }
+    elseif (($Buffer[$lead] -band 0xE0) -eq 0xC0) {
+        2
+    }
+    elseif (($Buffer[$lead] -band 0xF0) -eq 0xE0) {
+        3
+    }
+    else {
+        4
+    }
+
+    if ($lead + $charLength -gt $Count) {
+        $lead
+    }
+    else {
+        $Count
+    }
+}
+
+$spec = Get-ModuleSpec
+
+$module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
+Set-ActiveModule $module
+
+$length = $module.Params.length
+$offset = $module.Params.offset
+$path = $module.Params.path
+
+# Only a file is read, no choco.exe commands are run.
+$module.Result.Remove('choco_timings') > $null
+
+if ($length -lt 1 -or $length -gt $maxLength) {
+    Assert-TaskFailed -Message "Option 'length' must be between 1 and $maxLength, got $length"
+}
+
+$chocoCommand = Get-ChocolateyCommand
+$logPath = [System.IO.Path]::GetFullPath((Get-ChocolateyLogPath -ChocoCommand $chocoCommand)).TrimEnd('\')
+
+# Only the Chocolatey logs can be read, relative paths are taken to be in the logs folder.
+$fullPath = [System.IO.Path]::GetFullPath([System.IO.Path]::Combine($logPath, $path))
+if (-not $fullPath.StartsWith("$logPath\", [System.StringComparison]::OrdinalIgnoreCase)) {
+    Assert-TaskFailed -Message "The path '$path' is not in the Chocolatey logs folder '$logPath'"
+}
+
+if (-not (Test-Path -LiteralPath $fullPath -PathType Leaf)) {
+    Assert-TaskFailed -Message "The Chocolatey log '$fullPath' does not exist"
+}
+
+# Chocolatey and the output spool may still be writing to the file.
+$stream = New-Object -TypeName System.IO.FileStream -ArgumentList @(
+    $fullPath
+    [System.IO.FileMode]::Open
+    [System.IO.FileAccess]::Read
+    ([System.IO.FileShare]::ReadWrite -bor [System.IO.FileShare]::Delete)
+)
+
+try {
+    $size = $stream.Length
+
+    # A negative offset counts back from the end of the file.
+    $start = if ($offset -lt 0) { [Math]::Max(0, $size + $offset) } else { [Math]::Min($offset, $size) }
+    $count = [int][Math]::Min([long]$length, $size - $start)
+
+    $buffer = New-Object -TypeName byte[] -ArgumentList $count
+    $stream.Position = $start
+    $read = 0
+    while ($read -lt $count) {
+        $chunk = $stream.Read($buffer, $read, $count - $read)
+        if ($chunk -eq 0) {
+            break
+        }
+
+        $read += $chunk
+    }
+}
+finally {
+    $stream.Dispose()
+}
+
+# Keep whole characters, so that reading on from next_offset doesn't split one across two slices.
+$first = 0
+if ($start -gt 0) {
+    while ($first -lt $read -and $first -lt 3 -and ($buffer[$first] -band 0xC0) -eq 0x80) {
+        $first++
+    }
+}
+
+$last = $read
+if ($read -gt 0 -and $start + $read -lt $size) {
+    $last = Get-Utf8Boundary -Buffer $buffer -Count $read
+    if ($last -le $first) {
+        $last = $read
+    }
+}
+
+$module.Result.path = $fullPath
+$module.Result.size = $size
+$module.Result.offset = $start + $first
+$module.Result.next_offset = $start + $last
+$module.Result.eof = ($start + $last) -ge $size
+$module.Result.content = [System.Text.Encoding]::UTF8.GetString($buffer, $first, $last - $first)
+
+$module.ExitJson()
@@ -0,0 +1,111 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2020, Chocolatey Software
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = r'''
+---
+module: win_chocolatey_log
+version_added: '1.7.0'
+short_description: Reads a slice of a Chocolatey log on the host
+description:
+- Returns part of a log file in the C(logs) folder of the Chocolatey install
+  directory, such as the full output of C(choco.exe) written by
+  M(chocolatey.chocolatey.win_chocolatey) with I(spool_output) set, or
+  C(chocolatey.log) itself.
+- Large logs can be read a slice at a time by passing the I(next_offset) of
+  each result as the I(offset) of the next task, until I(eof) is true.
+- Only the file is read, no C(choco.exe) commands are run.
+options:
+  path:
+    description:
+    - The path to the log file, such as the I(stdout_log) returned by
+      M(chocolatey.chocolatey.win_chocolatey).
+    - A relative path is taken to be in the C(logs) folder, e.g.
+      C(chocolatey.log).
+    - Files outside the C(logs) folder cannot be read.
+    type: str
+    required: true
+  offset:
+    description:
+    - The byte offset in the file to start reading at.
+    - A negative value counts back from the end of the file, so C(-8192) reads
+      the last 8KB.
+    type: int
+    default: 0
+  length:
+    description:
+    - The most bytes to read, up to 1MB.
+    type: int
+    default: 65536
+notes:
+- The logs are expected to be UTF-8. The slice is moved to start and end on
+  whole characters, so I(offset) and I(next_offset) may differ from the ones
+  asked for by a few bytes.
+seealso:
+- module: chocolatey.chocolatey.win_chocolatey
+author:
+- Chocolatey Software (@chocolatey)
+'''
+
+EXAMPLES = r'''
+- name: Install a package, keeping the full output on the host
+  win_chocolatey:
+    name: git
+    state: present
+    spool_output: true
+  register: git_install
+
+- name: Read the full output of the install
+  win_chocolatey_log:
+    path: '{{ git_install.stdout_log }}'
+    length: 1048576
+  when: git_install.stdout_log is defined
+
+- name: Read the last 8KB of the Chocolatey log
+  win_chocolatey_log:
+    path: chocolatey.log
+    offset: -8192
+  register: choco_log
+
+- debug:
+    var: choco_log.content
+'''
+
+RETURN = r'''
+path:
+  description: The full path to the log file.
+  returned: always
+  type: str
+  sample: C:\ProgramData\chocolatey\logs\ansible\20240701T091231482-upgrade-5f0c2a1e.stdout.log
+size:
+  description: The size of the whole file, in bytes.
+  returned: always
+  type: int
+  sample: 48213
+offset:
+  description: The byte offset in the file the returned content starts at.
+  returned: always
+  type: int
+  sample: 0
+next_offset:
+  description: The byte offset in the file to read the next slice from.
+  returned: always
+  type: int
+  sample: 48213
+eof:
+  description: Whether the content runs to the end of the file.
+  returned: always
+  type: bool
+  sample: true
+content:
+  description: The content of the slice.
+  returned: always
+  type: str
+  sample: "Chocolatey v2.3.0\r\nUpgrading the following packages:\r\nall\r\n"
+'''
@@ -25,7 +25,7 @@ param()
 function Get-ModuleSpec {
     @{
         options             = @{
-            name                 = @{ type = "str"; required = $true }
+            name                 = @{ type = "str" }
             state                = @{ type = "str"; default = "present"; choices = "absent", "disabled", "present" }
 
             admin_only           = @{ type = "bool" }
@@ -37,11 +37,40 @@ function Get-ModuleSpec {
             source               = @{ type = "str" }
             source_username      = @{ type = "str" }
             source_password      = @{ type = "str"; no_log = $true }
+            sources              = @{
+                type = "list"
+                elements = "dict"
+                options = @{
+                    name                 = @{ type = "str"; required = $true }
+                    state                = @{ type = "str"; default = "present"; choices = "absent", "disabled", "present" }
+                    admin_only           = @{ type = "bool" }
+                    allow_self_service   = @{ type = "bool" }
+                    bypass_proxy         = @{ type = "bool" }
+                    certificate          = @{ type = "str" }
+                    certificate_password = @{ type = "str"; no_log = $true }
+                    priority             = @{ type = "int" }
+                    source               = @{ type = "str" }
+                    source_username      = @{ type = "str" }
+                    source_password      = @{ type = "str"; no_log = $true }
+                }
+                required_together = @(
+                    , @( 'source_username', 'source_password' )
+                )
+                required_by = @{
+                    'certificate_password' = 'certificate'
+                }
+            }
             update_password      = @{ type = "str"; default = "always"; choices = "always", "on_create" }
         }
         supports_check_mode = $true
-        required_together   = @(
+        mutually_exclusive  = @(
             # Explicit `,` prefix required to prevent the array unrolling, Ansible requires nested arrays here.
+            , @( 'name', 'sources' )
+        )
+        required_one_of     = @(
+            , @( 'name', 'sources' )
+        )
+        required_together   = @(
             , @( 'source_username', 'source_password' )
         )
         required_by         = @{
@@ -56,17 +85,8 @@ $module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
 Set-ActiveModule $module
 
 $name = $module.Params.name
+$sources = $module.Params.sources
 $state = $module.Params.state
-
-$admin_only = $module.Params.admin_only
-$allow_self_service = $module.Params.allow_self_service
-$bypass_proxy = $module.Params.bypass_proxy
-$certificate = $module.Params.certificate
-$certificate_password = $module.Params.certificate_password
-$priority = $module.Params.priority
-$source = $module.Params.source
-$source_username = $module.Params.source_username
-$source_password = $module.Params.source_password
 $update_password = $module.Params.update_password
 
 if ($module.DiffMode) {
@@ -76,125 +96,63 @@ if ($module.DiffMode) {
 
 $chocoCommand = Get-ChocolateyCommand
 
-$targetSource = Get-ChocolateySource -ChocoCommand $chocoCommand | Where-Object { $_.name -eq $name }
-
-if ($module.DiffMode) {
-    if ($null -ne $targetSource) {
-        $before = $targetSource.Clone()
-    }
-    else {
-        $before = @{}
-    }
-
-    $module.Diff.before = $before
-}
-
-if ($state -eq "absent" -and $null -ne $targetSource) {
-    Remove-ChocolateySource -ChocoCommand $chocoCommand -Name $name
-    Set-TaskResultChanged
-}
-elseif ($state -in ("disabled", "present")) {
-    $change = $false
-
-    if ($null -eq $targetSource) {
-        if ($null -eq $source) {
-            $message = "The source option must be set when creating a new source"
-            Assert-TaskFailed -Message $message
-        }
-
-        $change = $true
-    }
-    else {
-        $change = ($null -ne $source -and $source -ne $targetSource.source) -or
-            ($null -ne $source_username -and $source_username -ne $targetSource.source_username) -or
-            ($null -ne $source_password -and $update_password -eq "always") -or
-            ($null -ne $certificate -and $certificate -ne $targetSource.certificate) -or
-            ($null -ne $certificate_password -and $update_password -eq "always") -or
-            ($null -ne $priority -and $priority -ne $targetSource.priority) -or
-            ($null -ne $bypass_proxy -and $bypass_proxy -ne $targetSource.bypass_proxy) -or
-            ($null -ne $allow_self_service -and $allow_self_service -ne $targetSource.allow_self_service) -or
-            ($null -ne $admin_only -and $admin_only -ne $targetSource.admin_only)
-
-        if ($change) {
-            Remove-ChocolateySource -ChocoCommand $chocoCommand -Name $Name
-            Set-TaskResultChanged
-        }
+if ($null -ne $sources) {
+    foreach ($group in ($sources | Group-Object -Property { $_.name } | Where-Object Count -gt 1)) {
+        Assert-TaskFailed -Message "Source '$($group.Name)' is specified more than once in the sources list"
     }
 
-    if ($change) {
-        $sourceParams = @{
-            ChocoCommand = $chocoCommand
-            Name = $name
-            Source = $source
-            BypassProxy = $bypass_proxy
-            AllowSelfService = $allow_self_service
-            AdminOnly = $admin_only
-        }
-
-        if ($null -ne $priority) {
-            $sourceParams.Priority = $priority
-        }
+    # Read the configured sources once, and apply every difference in place.
+    $changes = @(Sync-ChocolateySource -ChocoCommand $chocoCommand -Source $sources -UpdatePassword $update_password)
 
-        if ($null -ne $source_username) {
-            $sourceParams.Username = $source_username
-            $sourceParams.Password = $source_password
+    $module.Result.changes = @(
+        foreach ($change in $changes) {
+            @{ name = $change.name; action = $change.action }
         }
+    )
 
-        if ($null -ne $certificate) {
-            $sourceParams.Certificate = $certificate
+    if ($changes.Count -gt 0) {
+        Set-TaskResultChanged
 
-            if ($null -ne $certificate_password) {
-                $sourceParams.CertificatePassword = $certificate_password
+        if ($module.DiffMode) {
+            foreach ($change in $changes) {
+                $module.Diff.before[$change.name] = $change.before
+                $module.Diff.after[$change.name] = $change.after
             }
         }
-
-        $targetSource = New-ChocolateySource @sourceParams
-        Set-TaskResultChanged
     }
 
-    # enable/disable the source if necessary
-    $action = if ($state -ne "disabled" -and $targetSource.disabled) {
-        "enable"
-    }
-    elseif ($state -eq "disabled" -and (-not $targetSource.disabled)) {
-        "disable"
-    }
-    else {
-        $null
-    }
-
-    if ($null -ne $action) {
-        $arguments = @(
-            $chocoCommand.Path
-            "source", $action
-            "--name", $name
-
-            if ($module.CheckMode) {
-                "--what-if"
-            }
-        )
+    $module.ExitJson()
+}
 
-        $command = Argv-ToString -Arguments $arguments
-        $result = Run-Command -Command $command
+$sourceOptions = @(
+    'admin_only'
+    'allow_self_service'
+    'bypass_proxy'
+    'certificate'
+    'certificate_password'
+    'priority'
+    'source'
+    'source_username'
+    'source_password'
+)
+
+$sourceEntry = @{
+    name = $name
+    state = $state
+}
+foreach ($option in $sourceOptions) {
+    $sourceEntry[$option] = $module.Params.$option
+}
 
-        if ($result.rc -ne 0) {
-            $message = "Failed to $action Chocolatey source '$name': $($result.stderr)"
-            Assert-TaskFailed -Message $message -CommandResult $result
-        }
+$change = Sync-ChocolateySource -ChocoCommand $chocoCommand -Source $sourceEntry -UpdatePassword $update_password
 
-        $targetSource.disabled = ($action -eq "disable")
-        Set-TaskResultChanged
-    }
+if ($null -ne $change) {
+    Set-TaskResultChanged
 
     if ($module.DiffMode) {
-        $module.Diff.after = $targetSource
+        $module.Diff.before = $change.before
+        $module.Diff.after = $change.after
     }
 }
 
-# finally remove the diff if there was no change
-if ($module.DiffMode -and -not $module.Result.changed) {
-    $module.Diff.before = @{}
-    $module.Diff.after = @{}
-}
-
 $module.ExitJson()
@@ -17,6 +17,10 @@ short_description: Manages Chocolatey sources
 description:
 - Used to managed Chocolatey sources configured on the client.
 - Requires Chocolatey to be already installed on the remote host.
+- Existing sources are updated in place in the Chocolatey config file, so the
+  source stays available to other Chocolatey processes while it is changed.
+  C(choco source add) is only run to create a source, or to set a password
+  that has to be encrypted by Chocolatey.
 options:
   admin_only:
     description:
@@ -49,7 +53,7 @@ options:
   name:
     description:
     - The name of the source to configure.
-    required: true
+    - Either this or I(sources) must be set.
     type: str
   priority:
     description:
@@ -75,6 +79,56 @@ options:
     - The password for I(source_username).
     - Required if I(source_username) is set.
     type: str
+  sources:
+    description:
+    - A list of sources to manage at once.
+    - The configured sources are read once and every difference is applied
+      together, with a single write of the Chocolatey config file for changes
+      to existing sources.
+    - Each entry accepts the same options as the task, other than
+      I(update_password), which applies to every entry.
+    - Cannot be used with I(name), and the other task level source options
+      are ignored.
+    type: list
+    elements: dict
+    version_added: '1.7.0'
+    suboptions:
+      name:
+        description: The name of the source to configure.
+        type: str
+        required: true
+      state:
+        description: The state of the source, see I(state) for details.
+        type: str
+        choices: [ absent, disabled, present ]
+        default: present
+      admin_only:
+        description: See I(admin_only).
+        type: bool
+      allow_self_service:
+        description: See I(allow_self_service).
+        type: bool
+      bypass_proxy:
+        description: See I(bypass_proxy).
+        type: bool
+      certificate:
+        description: See I(certificate).
+        type: str
+      certificate_password:
+        description: See I(certificate_password).
+        type: str
+      priority:
+        description: See I(priority).
+        type: int
+      source:
+        description: See I(source).
+        type: str
+      source_username:
+        description: See I(source_username).
+        type: str
+      source_password:
+        description: See I(source_password).
+        type: str
   state:
     description:
     - When C(absent), will remove the source.
@@ -97,6 +151,9 @@ options:
     - on_create
     default: always
     type: str
+notes:
+- Sources are added, changed, and removed one task at a time on a host, after
+  any package installs or other changes to Chocolatey already running there.
 seealso:
 - module: chocolatey.chocolatey.win_chocolatey
 - module: chocolatey.chocolatey.win_chocolatey_config
@@ -132,7 +189,64 @@ EXAMPLES = r'''
   win_chocolatey_source:
     name: chocolatey
     state: disabled
+
+- name: Manage all the sources at once
+  win_chocolatey_source:
+    sources:
+    - name: chocolatey
+      state: disabled
+    - name: internal repo
+      source: https://chocolatey-server/chocolatey
+      priority: 1
+    - name: old internal repo
+      state: absent
 '''
 
 RETURN = r'''
+changes:
+  description: The sources that differed from I(sources), and the action taken for each of them.
+  returned: when I(sources) is set
+  type: list
+  elements: dict
+  sample: [ { "name": "internal repo", "action": "update" }, { "name": "old internal repo", "action": "remove" } ]
+  version_added: '1.7.0'
+choco_timings:
+  description:
+  - The time spent running each command, and in each phase of the task.
+  - The command lines themselves are not returned, as they may contain secrets.
+  returned: always
+  type: dict
+  version_added: '1.7.0'
+  contains:
+    commands:
+      description: Each command run by the task, in the order they finished.
+      type: list
+      elements: dict
+      contains:
+        label:
+          description: The kind of command that was run, such as C(list), C(outdated), C(install), or C(pin).
+          type: str
+          sample: install
+        seconds:
+          description: The wall time the command took, in seconds.
+          type: float
+          sample: 12.482
+        rc:
+          description: The return code of the command.
+          type: int
+          sample: 0
+        stdout_bytes:
+          description: The size of the stdout of the command, in bytes.
+          type: int
+          sample: 1834
+        stderr_bytes:
+          description: The size of the stderr of the command, in bytes.
+          type: int
+          sample: 0
+    phases:
+      description:
+      - The time spent in each phase of the task, in seconds.
+      - Only C(lock) is recorded by this module, the time spent waiting for
+        other changes to Chocolatey on the host to finish.
+      type: dict
 '''
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2020, Chocolatey Software
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""NuGet package version handling shared by the controller side plugins."""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import re
+
+from functools import lru_cache
+
+from ansible.module_utils.common.text.converters import to_text
+
+
+_VERSION_RE = re.compile(
+    r'^\s*v?(?P<release>\d+(?:\.\d+){0,3})'
+    r'(?:-(?P<prerelease>[0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?'
+    r'(?:\+(?P<metadata>[0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?\s*$'
+)
+
+
+@lru_cache(maxsize=65536)
+def version_key(version):
+    """Returns a key that sorts NuGet versions in the order NuGet and Chocolatey use.
+
+    Versions have up to four numeric parts, with any missing parts treated as 0, so
+    1.2 and 1.2.0.0 are equal. A release sorts after all of its prereleases. Prerelease
+    labels are compared part by part, numeric parts numerically and before any
+    alphanumeric part, which are compared case insensitively. Build metadata is ignored.
+
+    Keys are cached, as the same versions tend to be compared many times over when
+    working through the facts of a whole fleet.
+
+    Raises ValueError if the value is not a valid version.
+    """
+    match = _VERSION_RE.match(to_text(version))
+    if not match:
+        raise ValueError("'%s' is not a valid NuGet version" % to_text(version))
+
+    release = [int(part) for part in match.group('release').split('.')]
+    release.extend([0] * (4 - len(release)))
+
+    prerelease = match.group('prerelease')
+    if prerelease is None:
+        return tuple(release) + (1, ())
+
+    labels = tuple(
+        (0, int(label), '') if label.isdigit() else (1, 0, label.lower())
+        for label in prerelease.split('.')
+    )
+    return tuple(release) + (0, labels)
+
+
+def is_prerelease(version):
+    """Returns whether the NuGet version is a prerelease."""
+    return version_key(version)[4] == 0
+
+
+def normalize_version(version):
+    """Returns the version in the normalized form used by NuGet v3 feeds and Chocolatey CLI v2.
+
+    A fourth part of 0 is dropped, leading zeroes are removed, and build metadata is ignored.
+    """
+    key = version_key(version)
+    release = key[:4] if key[3] else key[:3]
+    normalized = '.'.join(to_text(part) for part in release)
+
+    match = _VERSION_RE.match(to_text(version))
+    if match.group('prerelease'):
+        normalized += '-' + match.group('prerelease')
+
+    return normalized
+
+
+def latest_version(versions, allow_prerelease=False):
+    """Returns the highest of the versions, or None if there are none to pick from.
+
+    Prereleases are only considered when allow_prerelease is set. Values that are not
+    valid versions are ignored.
+    """
+    latest = None
+    latest_key = None
+
+    for version in versions:
+        try:
+            key = version_key(version)
+        except ValueError:
+            continue
+
+        if key[4] == 0 and not allow_prerelease:
+            continue
+
+        if latest_key is None or key > latest_key:
+            latest = version
+            latest_key = key
+
+    return latest
+
+
+class VersionRange:
+    """A NuGet version range, such as [1.0,2.0), that versions can be checked against.
+
+    A plain version is the minimum version, inclusive. A range in brackets gives an
+    inclusive or exclusive minimum and maximum either side of a comma, where either
+    may be left out, and [1.0] means exactly 1.0.
+    """
+
+    def __init__(self, spec):
+        self.spec = to_text(spec).strip()
+        self.minimum = self.maximum = None
+        self.min_inclusive = self.max_inclusive = True
+
+        if not self.spec:
+            raise ValueError('An empty value is not a valid NuGet version range')
+
+        if self.spec[0] not in '[(':
+            self.minimum = version_key(self.spec)
+            return
+
+        if self.spec[-1] not in '])' or len(self.spec) < 3:
+            raise ValueError("'%s' is not a valid NuGet version range" % self.spec)
+
+        self.min_inclusive = self.spec[0] == '['
+        self.max_inclusive = self.spec[-1] == ']'
+        bounds = self.spec[1:-1].split(',')
+
+        if len(bounds) == 1:
+            # [1.0] is the only exact version form, (1.0) doesn't match anything.
+            if not (self.min_inclusive and self.max_inclusive):
+                raise ValueError("'%s' is not a valid NuGet version range" % self.spec)
+
+            self.minimum = self.maximum = version_key(bounds[0])
+        elif len(bounds) == 2:
+            lower, upper = (bound.strip() for bound in bounds)
+            if not lower and not upper:
+                raise ValueError("'%s' is not a valid NuGet version range" % self.spec)
+
+            self.minimum = version_key(lower) if lower else None
+            self.maximum = version_key(upper) if upper else None
+        else:
+            raise ValueError("'%s' is not a valid NuGet version range" % self.spec)
+
+    def __contains__(self, version):
+        key = version_key(version)
+
+        if self.minimum is not None:
+            if key < self.minimum or (key == self.minimum and not self.min_inclusive):
+                return False
+
+        if self.maximum is not None:
+            if key > self.maximum or (key == self.maximum and not self.max_inclusive):
+                return False
+
+        return True
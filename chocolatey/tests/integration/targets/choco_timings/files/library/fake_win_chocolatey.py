@@ -0,0 +1,53 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2020, Chocolatey Software
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: fake_win_chocolatey
+short_description: Returns the given choco_timings, as win_chocolatey would
+description:
+- Stands in for M(chocolatey.chocolatey.win_chocolatey) in the choco_timings
+  callback tests, as the callback counts the packages of any module whose name
+  ends with C(win_chocolatey).
+options:
+  name:
+    description:
+    - The packages the task would manage.
+    type: list
+    elements: str
+  packages:
+    description:
+    - The package entries the task would manage.
+    type: list
+    elements: dict
+  choco_timings:
+    description:
+    - The timings to return.
+    type: dict
+    required: yes
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            name=dict(type='list', elements='str'),
+            packages=dict(type='list', elements='dict'),
+            choco_timings=dict(type='dict', required=True),
+        ),
+        supports_check_mode=True,
+    )
+
+    module.exit_json(changed=False, choco_timings=module.params['choco_timings'])
+
+
+if __name__ == '__main__':
+    main()
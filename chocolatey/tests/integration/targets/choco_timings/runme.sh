@@ -0,0 +1,19 @@
+#!/usr/bin/env bash
+
+# The choco_timings callback only reads the choco_timings returned by the modules, so it is run against a stand-in
+# module on made up hosts that returns known timings, rather than against the Windows hosts.
+
+set -eux
+
+CHOCOLATEY_TIMINGS_DIR="$(mktemp -d)"
+trap 'rm -rf "${CHOCOLATEY_TIMINGS_DIR}"' EXIT
+
+export ANSIBLE_CALLBACKS_ENABLED=chocolatey.chocolatey.choco_timings
+export ANSIBLE_LIBRARY=files/library
+export CHOCOLATEY_TIMINGS_OUTPUT_PATH="${CHOCOLATEY_TIMINGS_DIR}/chocolatey.prom"
+
+ansible-playbook -i files/hosts.ini files/test.yml "$@"
+
+# The playbook checks the file written at the end of the first play, this checks it is still whole at the end of
+# the run.
+test "$(tail -n 1 "${CHOCOLATEY_TIMINGS_OUTPUT_PATH}")" = '# EOF'
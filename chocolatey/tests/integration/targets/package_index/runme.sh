@@ -0,0 +1,19 @@
+#!/usr/bin/env bash
+
+# The package_index inventory plugin reads facts from the fact cache, so it is run against a jsonfile fact cache
+# filled with facts for a few made up hosts, rather than facts gathered from the Windows hosts. The facts are cached
+# by a playbook, as the format of the cache files differs between Ansible versions.
+
+set -eux
+
+ANSIBLE_FACT_CACHE="$(mktemp -d)"
+trap 'rm -rf "${ANSIBLE_FACT_CACHE}"' EXIT
+
+export ANSIBLE_CACHE_PLUGIN=jsonfile
+export ANSIBLE_CACHE_PLUGIN_CONNECTION="${ANSIBLE_FACT_CACHE}"
+export ANSIBLE_CACHE_PLUGIN_TIMEOUT=0
+
+ansible-playbook -i files/hosts.ini files/cache_facts.yml "$@"
+
+ANSIBLE_INVENTORY_ENABLED=ini,chocolatey.chocolatey.package_index \
+    ansible-playbook -i files/hosts.ini -i files/fleet.chocolatey.yml files/test.yml "$@"
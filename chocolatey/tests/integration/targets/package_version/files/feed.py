@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2020, Chocolatey Software
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# A stand-in NuGet feed for the package_version lookup tests. It serves a v3 service index with a package metadata
+# and package content resource under /v3/, a service index with only the package content resource under
+# /v3-content/, and a paged v2 FindPackagesById() under /v2/, supporting ETag revalidation for all of them. Every
+# request is logged to the given file as "<path> <status>" so the tests can check which requests were made.
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import argparse
+import hashlib
+import json
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PACKAGES = {
+    'ansible-test-pkg': [
+        ('1.2.0', True),
+        ('1.9.0', True),
+        ('1.10.0', True),
+        ('1.10.0.1', True),
+        ('2.0.0-rc.1', True),
+        ('3.0.0', False),
+    ],
+}
+
+PAGE_SIZE = 4
+
+ENTRY = '''<entry>
+  <m:properties>
+    <d:Id>{id}</d:Id>
+    <d:Version>{version}</d:Version>
+    <d:Published m:type="Edm.DateTime">{published}</d:Published>
+  </m:properties>
+</entry>'''
+
+FEED = '''<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"
+      xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices"
+      xmlns:m="http://schemas.microsoft.com/ado/2007/08/dataservices/metadata">
+{entries}
+{next}
+</feed>'''
+
+
+def registration_leaf(package, version, listed):
+    return {'catalogEntry': {'id': package, 'version': version, 'listed': listed}}
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        base = 'http://%s:%d' % self.server.server_address
+
+        if url.path == '/shutdown':
+            self._send(200, b'')
+            self.server.running = False
+            return
+
+        if url.path == '/v3/index.json':
+            body = json.dumps({
+                'version': '3.0.0',
+                'resources': [
+                    {'@id': base + '/v3/flat/', '@type': 'PackageBaseAddress/3.0.0'},
+                    {'@id': base + '/v3/registration/', '@type': 'RegistrationsBaseUrl/3.6.0'},
+                ],
+            })
+        elif url.path == '/v3-content/index.json':
+            body = json.dumps({
+                'version': '3.0.0',
+                'resources': [{'@id': base + '/v3/flat/', '@type': 'PackageBaseAddress/3.0.0'}],
+            })
+        elif url.path.startswith('/v3/registration/'):
+            package = url.path.split('/')[3]
+            if package not in PACKAGES:
+                self._send(404, b'')
+                return
+
+            # The first page is included in the registration index, the second is only linked to from it.
+            versions = PACKAGES[package]
+            page_url = '%s/v3/registration/%s/page/2.json' % (base, package)
+            if url.path.endswith('/index.json'):
+                body = json.dumps({'count': 2, 'items': [
+                    {'@id': '%s/v3/registration/%s/page/1.json' % (base, package),
+                     'items': [registration_leaf(package, version, listed) for version, listed in versions[:PAGE_SIZE]]},
+                    {'@id': page_url},
+                ]})
+            elif url.path.endswith('/page/2.json'):
+                body = json.dumps({'@id': page_url, 'items': [
+                    registration_leaf(package, version, listed) for version, listed in versions[PAGE_SIZE:]
+                ]})
+            else:
+                self._send(404, b'')
+                return
+        elif url.path.startswith('/v3/flat/') and url.path.endswith('/index.json'):
+            package = url.path.split('/')[3]
+            if package not in PACKAGES:
+                self._send(404, b'')
+                return
+
+            body = json.dumps({'versions': [version for version, dummy in PACKAGES[package]]})
+        elif url.path == "/v2/FindPackagesById()":
+            package = query.get('id', ["''"])[0].strip("'")
+            skip = int(query.get('$skip', ['0'])[0])
+            versions = PACKAGES.get(package, [])
+
+            entries = [
+                ENTRY.format(id=package, version=version, published='2020-01-01T00:00:00' if listed else '1900-01-01T00:00:00')
+                for version, listed in versions[skip:skip + PAGE_SIZE]
+            ]
+            next_link = ''
+            if skip + PAGE_SIZE < len(versions):
+                next_link = '<link rel="next" href="%s/v2/FindPackagesById()?id=\'%s\'&amp;$skip=%d" />' % (
+                    base, package, skip + PAGE_SIZE)
+
+            body = FEED.format(entries='\n'.join(entries), next=next_link)
+        else:
+            self._send(404, b'')
+            return
+
+        body = body.encode('utf-8')
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, b'', etag)
+        else:
+            self._send(200, body, etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+        with open(self.server.log_path, 'a') as log:
+            log.write('%s %d\n' % (self.path, status))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--log', required=True)
+    args = parser.parse_args()
+
+    server = HTTPServer(('127.0.0.1', args.port), FeedHandler)
+    server.log_path = args.log
+    server.running = True
+    server.timeout = 1
+
+    while server.running:
+        server.handle_request()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+# A stand-in NuGet v2 feed for the prefetch tests, serving the nupkg files in a folder over HTTP. It answers the
+# package queries made by win_chocolatey and choco.exe, and serves the same feed with the wrong package hashes under
+# /bad-hash/. Every request is logged to the given file as "<path> <status>" so the tests can check which requests
+# were made. Stop it by requesting /shutdown.
+
+[CmdletBinding()]
+param(
+    # The port to listen on.
+    [Parameter(Mandatory = $true)]
+    [int]
+    $Port,
+
+    # The folder with the nupkg files to serve.
+    [Parameter(Mandatory = $true)]
+    [string]
+    $Path,
+
+    # The file to log the requests to.
+    [Parameter(Mandatory = $true)]
+    [string]
+    $Log
+)
+
+$ErrorActionPreference = 'Stop'
+
+$base = "http://127.0.0.1:$Port"
+
+$packages = foreach ($file in Get-ChildItem -LiteralPath $Path -Filter '*.nupkg' -File) {
+    if ($file.Name -match '^(?<id>.+?)\.(?<version>\d+(\.\d+){1,3}(-[0-9A-Za-z.-]+)?)\.nupkg$') {
+        $sha512 = [System.Security.Cryptography.SHA512]::Create()
+        try {
+            $hash = [System.Convert]::ToBase64String($sha512.ComputeHash([System.IO.File]::ReadAllBytes($file.FullName)))
+        }
+        finally {
+            $sha512.Dispose()
+        }
+
+        @{
+            id = $matches.id
+            version = $matches.version
+            prerelease = $matches.version -like '*-*'
+            path = $file.FullName
+            hash = $hash
+        }
+    }
+}
+
+function Get-FeedEntry {
+    param($Package, $Root, [switch]$BadHash)
+
+    $hash = if ($BadHash) { [System.Convert]::ToBase64String((New-Object -TypeName byte[] -ArgumentList 64)) } else { $Package.hash }
+    $isLatest = -not $Package.prerelease -and $Package -eq ($packages | Where-Object {
+        $_.id -eq $Package.id -and -not $_.prerelease
+    } | Sort-Object -Property { [version]$_.version } | Select-Object -Last 1)
+
+    @"
+<entry>
+  <id>$Root/Packages(Id='$($Package.id)',Version='$($Package.version)')</id>
+  <title type="text">$($Package.id)</title>
+  <updated>2020-01-01T00:00:00Z</updated>
+  <author><name>ansible</name></author>
+  <content type="application/zip" src="$base/package/$($Package.id)/$($Package.version)" />
+  <m:properties>
+    <d:Id>$($Package.id)</d:Id>
+    <d:Version>$($Package.version)</d:Version>
+    <d:NormalizedVersion>$($Package.version)</d:NormalizedVersion>
+    <d:Dependencies></d:Dependencies>
+    <d:Description>Test for win_chocolatey module</d:Description>
+    <d:IsLatestVersion m:type="Edm.Boolean">$($isLatest.ToString().ToLowerInvariant())</d:IsLatestVersion>
+    <d:IsAbsoluteLatestVersion m:type="Edm.Boolean">false</d:IsAbsoluteLatestVersion>
+    <d:IsPrerelease m:type="Edm.Boolean">$($Package.prerelease.ToString().ToLowerInvariant())</d:IsPrerelease>
+    <d:Listed m:type="Edm.Boolean">true</d:Listed>
+    <d:Published m:type="Edm.DateTime">2020-01-01T00:00:00</d:Published>
+    <d:PackageHash>$hash</d:PackageHash>
+    <d:PackageHashAlgorithm>SHA512</d:PackageHashAlgorithm>
+    <d:PackageSize m:type="Edm.Int64">$((Get-Item -LiteralPath $Package.path).Length)</d:PackageSize>
+  </m:properties>
+</entry>
+"@
+}
+
+function Get-Feed {
+    param($Entries, $Root)
+
+    @"
+<?xml version="1.0" encoding="utf-8"?>
+<feed xml:base="$Root/" xmlns="http://www.w3.org/2005/Atom"
+      xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices"
+      xmlns:m="http://schemas.microsoft.com/ado/2007/08/dataservices/metadata">
+  <id>$Root/Packages</id>
+  <title type="text">Packages</title>
+  <updated>2020-01-01T00:00:00Z</updated>
+$($Entries -join "`n")
+</feed>
+"@
+}
+
+$listener = New-Object -TypeName System.Net.HttpListener
+$listener.Prefixes.Add("$base/")
+$listener.Start()
+
+try {
+    while ($true) {
+        $context = $listener.GetContext()
+        $request = $context.Request
+        $response = $context.Response
+
+        $path = [uri]::UnescapeDataString($request.Url.AbsolutePath)
+        $badHash = $path.StartsWith('/bad-hash/', [System.StringComparison]::OrdinalIgnoreCase)
+        $root = if ($badHash) { "$base/bad-hash" } else { $base }
+        if ($badHash) {
+            $path = $path.Substring('/bad-hash'.Length)
+        }
+
+        $status = 200
+        $contentType = 'application/atom+xml;type=feed;charset=utf-8'
+        $body = $null
+
+        if ($path -eq '/shutdown') {
+            $body = [byte[]]@()
+        }
+        elseif ($path -eq '/') {
+            $body = [System.Text.Encoding]::UTF8.GetBytes(@"
+<?xml version="1.0" encoding="utf-8"?>
+<service xml:base="$root/" xmlns="http://www.w3.org/2007/app" xmlns:atom="http://www.w3.org/2005/Atom">
+  <workspace><atom:title>Default</atom:title><collection href="Packages"><atom:title>Packages</atom:title></collection></workspace>
+</service>
+"@)
+            $contentType = 'application/xml;charset=utf-8'
+        }
+        elseif ($path -match "^/Packages\(Id='(?<id>[^']+)',Version='(?<version>[^']+)'\)$") {
+            $package = $packages | Where-Object { $_.id -eq $matches.id -and $_.version -eq $matches.version }
+            if ($package) {
+                $body = [System.Text.Encoding]::UTF8.GetBytes(
+                    '<?xml version="1.0" encoding="utf-8"?>' + "`n" + (Get-FeedEntry -Package $package -Root $root -BadHash:$badHash).Replace(
+                        '<entry>',
+                        '<entry xml:base="' + $root + '/" xmlns="http://www.w3.org/2005/Atom" xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices" xmlns:m="http://schemas.microsoft.com/ado/2007/08/dataservices/metadata">'
+                    )
+                )
+                $contentType = 'application/atom+xml;type=entry;charset=utf-8'
+            }
+            else {
+                $status = 404
+            }
+        }
+        elseif ($path -eq '/FindPackagesById()') {
+            $id = "$($request.QueryString['id'])".Trim("'")
+            $entries = $packages | Where-Object { $_.id -eq $id } | ForEach-Object {
+                Get-FeedEntry -Package $_ -Root $root -BadHash:$badHash
+            }
+
+            if ($request.QueryString['$filter'] -eq 'IsLatestVersion') {
+                $entries = $entries | Where-Object { $_ -like '*<d:IsLatestVersion m:type="Edm.Boolean">true<*' }
+            }
+
+            $body = [System.Text.Encoding]::UTF8.GetBytes((Get-Feed -Entries $entries -Root $root))
+        }
+        elseif ($path -match '^/package/(?<id>[^/]+)/(?<version>[^/]+)$') {
+            $package = $packages | Where-Object { $_.id -eq $matches.id -and $_.version -eq $matches.version }
+            if ($package) {
+                $body = [System.IO.File]::ReadAllBytes($package.path)
+                $contentType = 'application/zip'
+            }
+            else {
+                $status = 404
+            }
+        }
+        else {
+            $status = 404
+        }
+
+        if ($null -eq $body) {
+            $body = [byte[]]@()
+        }
+
+        $response.StatusCode = $status
+        $response.ContentType = $contentType
+        $response.ContentLength64 = $body.Length
+        $response.OutputStream.Write($body, 0, $body.Length)
+        $response.Close()
+
+        Add-Content -LiteralPath $Log -Value "$($request.Url.PathAndQuery) $status"
+
+        if ($path -eq '/shutdown') {
+            break
+        }
+    }
+}
+finally {
+    $listener.Stop()
+}
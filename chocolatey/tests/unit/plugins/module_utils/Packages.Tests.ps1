@@ -0,0 +1,200 @@
+#Requires -Modules @{ ModuleName = 'Pester'; ModuleVersion = '5.0.0' }
+
+<#
+    .SYNOPSIS
+    Tests for reading installed packages from their nuspec files in Packages.psm1.
+
+    .DESCRIPTION
+    Runs against the fixture lib folders next to this file, so it can be run under
+    pwsh on any platform without choco.exe:
+
+        Invoke-Pester -Path ./chocolatey/tests/unit
+#>
+
+BeforeAll {
+    $moduleUtilsPath = Join-Path -Path $PSScriptRoot -ChildPath '../../../../plugins/module_utils'
+    $fixturesPath = Join-Path -Path $PSScriptRoot -ChildPath 'fixtures'
+
+    function Import-ModuleUtil {
+        param([string]$Name)
+
+        # The modules named by the #Requires statements are only available to modules run by Ansible on a Windows
+        # host, and none of the functions under test use them.
+        $path = Join-Path -Path $moduleUtilsPath -ChildPath "$Name.psm1"
+        $source = (Get-Content -LiteralPath $path -Raw) -replace '(?m)^#Requires .*$', ''
+        New-Module -Name $Name -ScriptBlock ([scriptblock]::Create($source)) | Import-Module -Force
+    }
+
+    function New-ChocolateyInstall {
+        <#
+            .SYNOPSIS
+            Copies a fixture lib folder into a Chocolatey install folder, and outputs a command for its choco.exe.
+        #>
+        param([string]$Fixture)
+
+        $installPath = Join-Path -Path $TestDrive -ChildPath ([System.Guid]::NewGuid().ToString('N'))
+        $binPath = Join-Path -Path $installPath -ChildPath 'bin'
+        New-Item -Path $binPath -ItemType Directory -Force > $null
+        Copy-Item -LiteralPath (Join-Path -Path $fixturesPath -ChildPath $Fixture) -Destination (Join-Path -Path $installPath -ChildPath 'lib') -Recurse
+
+        # Only the path of the command is used, a script stands in for choco.exe on any platform.
+        $chocoPath = Join-Path -Path $binPath -ChildPath 'choco.ps1'
+        Set-Content -LiteralPath $chocoPath -Value ''
+        Get-Command -Name $chocoPath
+    }
+
+    Import-ModuleUtil -Name Common
+    Import-ModuleUtil -Name Packages
+}
+
+AfterAll {
+    Remove-Module -Name Packages, Common -Force -ErrorAction SilentlyContinue
+}
+
+Describe 'ConvertTo-NormalizedVersion' {
+    It 'normalizes <Version> to <Expected>' -TestCases @(
+        @{ Version = '1.2.3'; Expected = '1.2.3' }
+        @{ Version = '1.02'; Expected = '1.2.0' }
+        @{ Version = '2'; Expected = '2.0.0' }
+        @{ Version = '24.07'; Expected = '24.7.0' }
+        @{ Version = '1.2.3.0'; Expected = '1.2.3' }
+        @{ Version = '1.2.3.4'; Expected = '1.2.3.4' }
+        @{ Version = '1.2.3.0+abc'; Expected = '1.2.3' }
+        @{ Version = '01.0.0-beta1'; Expected = '1.0.0-beta1' }
+        @{ Version = '1.0-rc.2+build.5'; Expected = '1.0.0-rc.2' }
+    ) {
+        ConvertTo-NormalizedVersion -Version $Version | Should -BeExactly $Expected
+    }
+
+    It 'outputs <Version> unchanged when it cannot be parsed' -TestCases @(
+        @{ Version = '' }
+        @{ Version = 'latest' }
+        @{ Version = '1.2.3.4.5' }
+    ) {
+        ConvertTo-NormalizedVersion -Version $Version | Should -BeExactly $Version
+    }
+
+    It 'normalizes versions from the pipeline' {
+        '1.0', '2.01.0.0' | ConvertTo-NormalizedVersion | Should -BeExactly '1.0.0', '2.1.0'
+    }
+}
+
+Describe 'Get-ChocolateyNuspecPackage' {
+    It 'reads the id and version of each package' {
+        $packages = @(Get-ChocolateyNuspecPackage -Path (Join-Path -Path $fixturesPath -ChildPath 'lib') | Sort-Object { $_.package })
+
+        $packages.Count | Should -Be 3
+        $packages[0].package | Should -BeExactly '7zip'
+        $packages[0].version | Should -BeExactly '24.07'
+        $packages[1].package | Should -BeExactly 'dotnet-runtime'
+        $packages[1].version | Should -BeExactly '8.0.7.0'
+        $packages[2].package | Should -BeExactly 'git'
+        $packages[2].version | Should -BeExactly '2.45.1'
+    }
+
+    It 'normalizes the versions when asked to' {
+        $scanParams = @{
+            Path = Join-Path -Path $fixturesPath -ChildPath 'lib'
+            Normalize = $true
+        }
+        $packages = @(Get-ChocolateyNuspecPackage @scanParams | Sort-Object { $_.package })
+
+        $packages.version | Should -BeExactly '24.7.0', '8.0.7', '2.45.1'
+    }
+
+    It 'throws when a nuspec has no version' {
+        { Get-ChocolateyNuspecPackage -Path (Join-Path -Path $fixturesPath -ChildPath 'lib-malformed') } |
+            Should -Throw -ExpectedMessage '*Could not read the package id and version*broken.nuspec*'
+    }
+
+    It 'throws when a package folder has no nuspec' {
+        { Get-ChocolateyNuspecPackage -Path (Join-Path -Path $fixturesPath -ChildPath 'lib-missing') } |
+            Should -Throw -ExpectedMessage "*Expected one nuspec file in package folder*orphan*found 0*"
+    }
+
+    It 'throws when a package has a pending installation' {
+        $chocoCommand = New-ChocolateyInstall -Fixture 'lib'
+        $libPath = Join-Path -Path (Split-Path -Path (Split-Path -Path $chocoCommand.Path)) -ChildPath 'lib'
+        Set-Content -LiteralPath (Join-Path -Path $libPath -ChildPath 'git/.chocolateyPending') -Value ''
+
+        { Get-ChocolateyNuspecPackage -Path $libPath } | Should -Throw -ExpectedMessage '*has a pending installation*'
+    }
+
+    It 'throws when the lib folder does not exist' {
+        { Get-ChocolateyNuspecPackage -Path (Join-Path -Path $TestDrive -ChildPath 'missing') } |
+            Should -Throw -ExpectedMessage '*does not exist*'
+    }
+}
+
+Describe 'Get-ChocolateyPackage' {
+    BeforeEach {
+        Mock -ModuleName Packages -CommandName Get-ChocolateyVersion -MockWith { [version]'2.3.0' }
+        Mock -ModuleName Packages -CommandName Read-ChocolateyCache -MockWith { $null }
+        Mock -ModuleName Packages -CommandName Write-ChocolateyCache -MockWith { }
+        Mock -ModuleName Packages -CommandName Get-ChocolateyCliPackage -MockWith {
+            , @(@{ package = 'from-choco'; version = '1.0.0' })
+        }
+    }
+
+    It 'reads the packages from the nuspec files without running choco.exe' {
+        $chocoCommand = New-ChocolateyInstall -Fixture 'lib'
+
+        $packages = @(Get-ChocolateyPackage -ChocoCommand $chocoCommand | Sort-Object { $_.package })
+
+        $packages.package | Should -BeExactly '7zip', 'dotnet-runtime', 'git'
+        $packages.version | Should -BeExactly '24.7.0', '8.0.7', '2.45.1'
+        Should -Invoke -ModuleName Packages -CommandName Get-ChocolateyCliPackage -Times 0 -Exactly
+        Should -Invoke -ModuleName Packages -CommandName Write-ChocolateyCache -Times 1 -Exactly
+    }
+
+    It 'keeps the versions as written for Chocolatey CLI before v2' {
+        Mock -ModuleName Packages -CommandName Get-ChocolateyVersion -MockWith { [version]'1.4.0' }
+        $chocoCommand = New-ChocolateyInstall -Fixture 'lib'
+
+        $packages = @(Get-ChocolateyPackage -ChocoCommand $chocoCommand | Sort-Object { $_.package })
+
+        $packages.version | Should -BeExactly '24.07', '8.0.7.0', '2.45.1'
+    }
+
+    It 'filters the packages to the normalized version <Version>' -TestCases @(
+        @{ Version = '24.7' }
+        @{ Version = '24.07.0.0' }
+    ) {
+        $chocoCommand = New-ChocolateyInstall -Fixture 'lib'
+
+        $packages = @(Get-ChocolateyPackage -ChocoCommand $chocoCommand -Version $Version)
+
+        $packages.package | Should -BeExactly '7zip'
+        Should -Invoke -ModuleName Packages -CommandName Write-ChocolateyCache -Times 0 -Exactly
+    }
+
+    It 'falls back to choco.exe when a package has a <Problem> nuspec' -TestCases @(
+        @{ Fixture = 'lib-malformed'; Problem = 'malformed' }
+        @{ Fixture = 'lib-missing'; Problem = 'missing' }
+    ) {
+        $chocoCommand = New-ChocolateyInstall -Fixture $Fixture
+
+        $packages = @(Get-ChocolateyPackage -ChocoCommand $chocoCommand)
+
+        $packages.package | Should -BeExactly 'from-choco'
+        Should -Invoke -ModuleName Packages -CommandName Get-ChocolateyCliPackage -Times 1 -Exactly -ParameterFilter {
+            -not $Version
+        }
+    }
+
+    It 'reuses the persisted packages while the lib folder is unchanged' {
+        $chocoCommand = New-ChocolateyInstall -Fixture 'lib-malformed'
+        Mock -ModuleName Packages -CommandName Read-ChocolateyCache -MockWith {
+            @{
+                # The fingerprint of the lib folder the packages were persisted for.
+                fingerprint = & (Get-Module -Name Packages) { Get-ChocolateyLibFingerprint -ChocoCommand $args[0] } $ChocoCommand
+                packages = @(@{ package = 'cached'; version = '3.0.0' })
+            }
+        }
+
+        $packages = @(Get-ChocolateyPackage -ChocoCommand $chocoCommand)
+
+        $packages.package | Should -BeExactly 'cached'
+        Should -Invoke -ModuleName Packages -CommandName Get-ChocolateyCliPackage -Times 0 -Exactly
+    }
+}
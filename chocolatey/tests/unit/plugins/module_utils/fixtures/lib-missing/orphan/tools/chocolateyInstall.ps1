@@ -0,0 +1 @@
+# A package folder left behind without its nuspec file.